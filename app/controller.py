@@ -1,17 +1,26 @@
 from PyQt5 import QtWidgets
 from app.utils.clean_cache import remove_directories
-from app.design.design import Ui_MainWindow
+from app.design.design import Ui_MainWindow, text_symbol
 from app.services.upload_signal import SignalFileUploader
 from app.services.playback_worker import PlaybackWorker
-from pyqtgraph import mkPen
+from pyqtgraph import mkPen, mkBrush, PlotCurveItem, LinearRegionItem, BarGraphItem, ScatterPlotItem
 import numpy as np
+import os
 import time
-from PyQt5.QtCore import QThread
-from PyQt5.QtMultimedia import QSound
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
 
-from app.processing.filtering import bandpass_filter
-from app.processing.segmentation import segment_ecg_pipeline
-from app.processing.classifier import ECGClassifier
+from app.processing.overview import compute_envelope, envelope_polyline, heart_rate_trend
+from app.services.review_queue import ReviewQueue
+
+# Shading of detected episodes by beat label (RGB); anything else uses the default
+EPISODE_COLORS = {"AFib": (255, 140, 0), "PVC": (220, 20, 60)}
+DEFAULT_EPISODE_COLOR = (147, 112, 219)
+NORMAL_ANNOTATIONS = ("N", ".", "*")
+
+
+class ReviewSignals(QObject):
+    """Carries review-queue results from its loader thread to the GUI thread."""
+    loaded = pyqtSignal(object, object)
 
 
 class MainWindowController:
@@ -25,12 +34,20 @@ class MainWindowController:
         # Window settings
         self.window_size = 5.0
         self.current_window_start = 0
+        self._syncing_navigator = False  # guards region updates made by the controller itself
 
-        # Signal data
-        self.x_data = None
+        # Signal data (time axis kept as a uniform Timebase, not a float array)
+        self.timebase = None
         self.y_data = None
         self.filtered_signal = None
         self.qrs_peaks = None
+        self.annotation_times = None
+        self.annotation_index = None  # EventIndex of reference annotation symbols
+        self.episode_index = None  # EventIndex of detected (non-normal) episodes
+        self.beat_labels = None
+        self.unusable_intervals = None  # (k, 2) sample ranges failing the signal-quality check
+        self.record_path = None
+        self.analysis_params = {}  # overrides of analysis.ANALYSIS_PARAMS
 
         # Playback control
         self.is_playing = False
@@ -48,7 +65,7 @@ class MainWindowController:
         self.setup_connections()
 
         # alarm settings
-        self.alert_sound = QSound("static/alarm/ECG_Alarm.wav")
+        self._alert_sound = None  # QtMultimedia is loaded with the first alarm, not at startup
         self.alarm_enabled = True  # master ON / OFF
         self.alarm_pause = False  # user-pressed “pause” button
         self.alarm_cooldown_sec = 4  # minimum seconds between repeats
@@ -56,8 +73,29 @@ class MainWindowController:
 
         self.valid_intervals = None
 
-        # Load classifier once
-        self.classifier = ECGClassifier("models/arrhythmia_model.h5")
+        # Classifier + analysis chain live in the analysis process, started on first analysis
+        # (TensorFlow/biosppy kept out of startup and out of the GUI process)
+        self._analysis_worker = None  # results of uploads and the review queue arrive in shared memory
+        self._shared_block = None  # shared-memory block behind the arrays on screen
+        self.review_queue = None
+        self.review_signals = ReviewSignals()
+        self.review_signals.loaded.connect(self.on_review_loaded)
+
+    @property
+    def analysis_worker(self):
+        if self._analysis_worker is None:
+            from app.services.analysis_worker import AnalysisWorker
+            self._analysis_worker = AnalysisWorker()
+            self._analysis_worker.finished.connect(self.show_analysis)
+            self._analysis_worker.failed.connect(lambda error: print(f"Processing error: {error}"))
+        return self._analysis_worker
+
+    @property
+    def alert_sound(self):
+        if self._alert_sound is None:
+            from PyQt5.QtMultimedia import QSound
+            self._alert_sound = QSound("static/alarm/ECG_Alarm.wav")
+        return self._alert_sound
 
     def setup_connections(self):
         self.ui.upload_button.clicked.connect(self.upload_signal)
@@ -66,52 +104,132 @@ class MainWindowController:
         self.ui.quit_app_button.clicked.connect(self.close_app)
         self.ui.toggle_alarm_button.clicked.connect(self.toggle_alarm)
         self.ui.pause_alarm_button.clicked.connect(self.pause_alarm)
+        self.ui.navigator_region.sigRegionChanged.connect(self.on_navigator_region_changed)
+        self.ui.open_queue_button.clicked.connect(self.open_review_queue)
+        self.ui.previous_record_button.clicked.connect(self.previous_record)
+        self.ui.next_record_button.clicked.connect(self.next_record)
 
     def upload_signal(self):
-        if self.x_data is not None and self.y_data is not None:
+        if self.timebase is not None and self.y_data is not None:
             self.clear_signal()
         filepath = self.service.upload_signal_file()
         if not filepath:
             return
 
-        x_data, y_data, _ = self.service.load_signal_data(filepath)
-        if x_data is not None and y_data is not None:
-            self.x_data = x_data
-            self.y_data = y_data
-            self.process_ecg_signal(y_data)
+        self.record_path = filepath
+        self.reanalyze()
+
+    def reanalyze(self, **params):
+        """(Re)analyze the record on screen, optionally with changed parameters (filter band,
+        window size, classification mode); stages upstream of the change come from the cache.
+        Runs in the analysis process: the GUI stays live and show_analysis() gets the result."""
+        if self.record_path is None:
+            return
+        self.analysis_params.update(params)
+        self.analysis_worker.submit(self.record_path, **self.analysis_params)
+
+    def show_analysis(self, result):
+        """Put a finished analysis result on screen."""
+        if self.is_playing:
+            self.stop_playback()
+        previous_block, self._shared_block = self._shared_block, result.get("shared_block")
+        self.timebase = result["timebase"]
+        self.sampling_rate = self.timebase.fs
+        self.y_data = result["raw_signal"]
+        self.filtered_signal = result["filtered_signal"]
+        self.qrs_peaks = result["qrs_peaks"]
+        self.beat_labels = result["beat_labels"]
+        self.unusable_intervals = result["unusable_intervals"]
+        self.annotation_times = result["annotation_times"]
+        self.annotation_index = result["annotation_index"]
+        self.episode_index = result["episode_index"]
+        self.current_window_start = self.timebase.t0
+        self.heart_rate_history = []
 
-    def process_ecg_signal(self, ecg_signal):
-        try:
-            if len(self.x_data) > 1:
-                self.sampling_rate = 1 / (self.x_data[1] - self.x_data[0])
+        self.log_classification(result["classification_stats"])
 
-            self.filtered_signal = bandpass_filter(ecg_signal, fs=self.sampling_rate)
+        self.calculate_heart_rate()
+        self.update_navigator()
+        self.plot_signal()
+        if previous_block is not None:
+            self.analysis_worker.release(previous_block)
 
-            # Segment the filtered signal around R-peaks
-            beats = segment_ecg_pipeline(self.filtered_signal, sampling_rate=self.sampling_rate)
+    def log_classification(self, stats):
+        if "routing_ratio" in stats:
+            timings = ("timings cached" if stats.get("cached") else
+                       f"screen {stats['stage1_sec'] * 1e3:.1f} ms, model {stats['stage2_sec'] * 1e3:.1f} ms")
+            print(f"Cascade: {stats['n_forwarded']}/{stats['n_beats']} beats sent to the model "
+                  f"({stats['routing_ratio']:.0%}), {timings}")
+        else:
+            print(f"Classified {stats['n_beats']} beats with {stats['n_inferred']} model inputs")
 
-            # Classify the first few beats (optional debug)
-            for i, beat in enumerate(beats[:3]):
-                result = self.classifier.predict(beat)
-                print(f"Beat {i}: {result}")
+    def analyze_record_file(self, file_path):
+        """Review-queue worker: analyze one record in the analysis process (called on a background thread)."""
+        return self.analysis_worker.analyze(file_path, **self.analysis_params)
 
-            # Detect QRS peaks for heart rate calc and plotting
-            from biosppy.signals import ecg
-            qrs_info = ecg.ecg(signal=self.filtered_signal, sampling_rate=self.sampling_rate, show=False)
-            self.qrs_peaks = qrs_info['rpeaks']
+    def release_result(self, result):
+        """Free the shared memory of a result that is not (or no longer) on screen."""
+        if result is not None and result.get("shared_block") is not None:
+            self.analysis_worker.release(result["shared_block"])
 
-            self.calculate_heart_rate()
-            self.plot_signal()
+    def open_review_queue(self):
+        directory = self.service.select_review_directory()
+        if not directory:
+            return
+        if self.review_queue is not None:
+            self.review_queue.close()
+        self.analysis_worker  # create it on the GUI thread, so its signals are delivered here
+        self.review_queue = ReviewQueue.from_directory(directory, self.analyze_record_file,
+                                                       release=self.release_result)
+        self.load_review_record()
+
+    def next_record(self):
+        if self.review_queue is not None:
+            self.review_queue.step(1)
+            self.load_review_record()
+
+    def previous_record(self):
+        if self.review_queue is not None:
+            self.review_queue.step(-1)
+            self.load_review_record()
+
+    def load_review_record(self):
+        """Ask the queue for the current record; on_review_loaded() shows it once it is ready."""
+        queue = self.review_queue
+        if len(queue) == 0:
+            self.show_review_record(None)
+            return
+        name = os.path.basename(queue.current_path)
+        self.ui.person_data_label.setText(f"Record {queue.position + 1}/{len(queue)}: {name} (analyzing...)")
+        future = queue.load_current()
+        future.add_done_callback(lambda f: f.cancelled() or self.review_signals.loaded.emit(queue, f.result()))
+
+    def on_review_loaded(self, queue, loaded):
+        path, result = loaded
+        if queue is not self.review_queue or path != queue.current_path:
+            self.release_result(result)  # the user has moved on; the queue may still hold it
+            return
+        self.show_review_record(result)
 
-        except Exception as e:
-            print(f"Processing error: {e}")
+    def show_review_record(self, result):
+        queue = self.review_queue
+        if len(queue) == 0:
+            self.ui.person_data_label.setText("Review queue: no records found")
+            return
+        if result is None:
+            self.ui.person_data_label.setText(f"Record {queue.position + 1}/{len(queue)}: unreadable")
+            return
+        name = os.path.basename(queue.current_path)
+        self.ui.person_data_label.setText(f"Record {queue.position + 1}/{len(queue)}: {name}")
+        self.record_path = queue.current_path
+        self.show_analysis(result)
 
     def calculate_heart_rate(self):
         if self.qrs_peaks is None or len(self.qrs_peaks) < 2:
             self.current_heart_rate = 0
             return
 
-        rr_intervals = np.diff(self.x_data[self.qrs_peaks])
+        rr_intervals = np.diff(self.qrs_peaks) / self.timebase.fs
         self.valid_intervals = rr_intervals[(rr_intervals > 0.3) & (rr_intervals < 1.5)]
 
         if len(self.valid_intervals) > 0:
@@ -126,37 +244,51 @@ class MainWindowController:
         """Plots the filtered ECG signal with optional playback and QRS peaks."""
         self.ui.ecg_plot_widget.clear()
 
-        if self.filtered_signal is None or self.x_data is None:
+        if self.filtered_signal is None or self.timebase is None:
             return
 
-        # Define window range
+        # Define window range as an index slice (O(1) on a uniform timebase)
         window_start = self.current_window_start
         window_end = window_start + self.window_size
-        mask = (self.x_data >= window_start) & (self.x_data <= window_end)
-        x_window = self.x_data[mask]
-        y_window = self.filtered_signal[mask]
+        window = self.timebase.slice_between(window_start, window_end)
 
         # Plot main ECG signal in dark green
-        self.ui.ecg_plot_widget.plot(x_window, y_window, pen=mkPen('#033500', width=3))
+        self.ui.ecg_plot_widget.plot(self.timebase.times(window.start, window.stop),
+                                     self.filtered_signal[window], pen=mkPen('#033500', width=3))
 
         # Plot already-played signal portion in light green (during playback)
-        if current_pos is not None and 0 < current_pos < len(self.x_data):
-            mask_played = (self.x_data[:current_pos] >= window_start) & (self.x_data[:current_pos] <= window_end)
-            self.ui.ecg_plot_widget.plot(
-                self.x_data[:current_pos][mask_played],
-                self.filtered_signal[:current_pos][mask_played],
-                pen=mkPen('#55b135', width=2),
-                name='Playback'
-            )
+        if current_pos is not None and 0 < current_pos < self.timebase.n:
+            played_stop = min(current_pos, window.stop)
+            if played_stop > window.start:
+                self.ui.ecg_plot_widget.plot(
+                    self.timebase.times(window.start, played_stop),
+                    self.filtered_signal[window.start:played_stop],
+                    pen=mkPen('#55b135', width=2),
+                    name='Playback'
+                )
+
+        # Shade stretches masked by the signal-quality check
+        if self.unusable_intervals is not None and len(self.unusable_intervals):
+            first = np.searchsorted(self.unusable_intervals[:, 1], window.start, side='right')
+            last = np.searchsorted(self.unusable_intervals[:, 0], window.stop)
+            for start, stop in self.unusable_intervals[first:last]:
+                self.ui.ecg_plot_widget.addItem(LinearRegionItem(
+                    values=(self.timebase.time_of(start), self.timebase.time_of(stop)),
+                    movable=False,
+                    brush=mkBrush(128, 128, 128, 70),
+                    pen=mkPen(None)
+                ))
+
+        self.plot_events(window_start, window_end, self.filtered_signal[window])
 
         # Plot QRS peaks as red circles
         if self.qrs_peaks is not None:
-            valid_peaks = [p for p in self.qrs_peaks if
-                           p < len(self.x_data) and window_start <= self.x_data[p] <= window_end]
-            for p in valid_peaks:
+            first, last = np.searchsorted(self.qrs_peaks, [window.start, window.stop])
+            valid_peaks = self.qrs_peaks[first:last]
+            if len(valid_peaks):
                 self.ui.ecg_plot_widget.plot(
-                    [self.x_data[p]],
-                    [self.filtered_signal[p]],
+                    self.timebase.time_of(valid_peaks),
+                    self.filtered_signal[valid_peaks],
                     pen=None,
                     symbol='o',
                     symbolSize=10,
@@ -168,6 +300,81 @@ class MainWindowController:
         self.ui.ecg_plot_widget.setXRange(window_start, window_end)
         self.ui.ecg_plot_widget.enableAutoRange(axis='y')
 
+    def plot_events(self, window_start, window_end, window_signal):
+        """Detected episodes as one batched bar item, annotation and episode labels as one text scatter."""
+        if len(window_signal) == 0:
+            return
+        low, high = float(window_signal.min()), float(window_signal.max())
+        margin = 0.15 * (high - low or 1.0)
+        texts, xs, ys, brushes = [], [], [], []
+
+        if self.episode_index is not None:
+            hits = self.episode_index.query(window_start, window_end)
+            if len(hits):
+                labels = self.episode_index.labels[hits]
+                colors = [EPISODE_COLORS.get(label, DEFAULT_EPISODE_COLOR) for label in labels]
+                starts = np.maximum(self.episode_index.starts[hits], window_start)
+                stops = np.minimum(self.episode_index.stops[hits], window_end)
+                bars = BarGraphItem(x0=starts, x1=stops, y0=low - margin, y1=high + margin,
+                                    brushes=[mkBrush(*color, 60) for color in colors], pen=mkPen(None))
+                bars.setZValue(-10)
+                self.ui.ecg_plot_widget.addItem(bars, ignoreBounds=True)
+                texts += list(labels)
+                xs += list(starts)
+                ys += [low - margin] * len(hits)
+                brushes += [mkBrush(*color) for color in colors]
+
+        if self.annotation_index is not None:
+            hits = self.annotation_index.query(window_start, window_end)
+            labels = self.annotation_index.labels[hits]
+            texts += list(labels)
+            xs += list(self.annotation_index.starts[hits])
+            ys += [high + margin] * len(hits)
+            brushes += [mkBrush('#808080' if label in NORMAL_ANNOTATIONS else 'r') for label in labels]
+
+        if texts:
+            self.ui.ecg_plot_widget.addItem(ScatterPlotItem(
+                x=xs, y=ys, symbol=[text_symbol(text) for text in texts],
+                size=[14 * max(1, 0.6 * len(text)) for text in texts], brush=brushes, pen=mkPen(None)
+            ))
+
+    def update_navigator(self):
+        """Draw the whole-record envelope and HR trend once per loaded record."""
+        navigator = self.ui.navigator_plot_widget
+        navigator.clear()
+        navigator.addItem(self.ui.navigator_region)
+        self.ui.navigator_hr_view.clear()
+
+        starts, mins, maxs = compute_envelope(self.filtered_signal, n_bins=max(navigator.width(), 500))
+        x, y = envelope_polyline(self.timebase.time_of(starts), mins, maxs)
+        navigator.plot(x, y, pen=mkPen('#033500', width=1))
+
+        if self.qrs_peaks is not None:
+            hr_peaks, hr = heart_rate_trend(self.qrs_peaks, self.timebase.fs)
+            self.ui.navigator_hr_view.addItem(PlotCurveItem(self.timebase.time_of(hr_peaks), hr,
+                                                            pen=mkPen('r', width=1)))
+            self.ui.navigator_hr_view.setYRange(30, 200)
+
+        navigator.setXRange(self.timebase.t0, self.timebase.end, padding=0)
+        self.ui.navigator_region.setBounds((self.timebase.t0, self.timebase.end))
+        self.sync_navigator_region()
+
+    def sync_navigator_region(self):
+        """Move the navigator's region to the detail window without re-triggering a redraw."""
+        self._syncing_navigator = True
+        self.ui.navigator_region.setRegion((self.current_window_start,
+                                            self.current_window_start + self.window_size))
+        self._syncing_navigator = False
+
+    def on_navigator_region_changed(self):
+        """User dragged the overview region: jump the detail plot there."""
+        if self._syncing_navigator or self.timebase is None:
+            return
+        window_start, _ = self.ui.navigator_region.getRegion()
+        self.current_window_start = window_start
+        self.sync_navigator_region()  # keep the region exactly one window wide
+        self.plot_signal(self.current_index if self.is_playing else None)
+
     def toggle_play_pause_signal(self):
         """Toggle signal playback."""
         if not self.is_playing:
@@ -197,7 +404,7 @@ class MainWindowController:
         Keeps the GUI in-sync with playback progress and updates HR in real-time.
         """
         # --- 1. Clamp index to valid range --------------------------------------
-        if current_pos >= len(self.x_data):
+        if current_pos >= self.timebase.n:
             # End of signal reached – stop gracefully
             self.stop_playback()
             return
@@ -206,26 +413,40 @@ class MainWindowController:
 
         # --- 2. Update scrolling window -----------------------------------------
         self.current_window_start = max(0,
-                                        self.x_data[self.current_index] - self.window_size)
+                                        self.timebase.time_of(self.current_index) - self.window_size)
 
         # --- 3. Re-draw ----------------------------------------------------------
         self.plot_signal(self.current_index)
+        self.sync_navigator_region()
+
+        # --- 4. Skip HR / alarms where the signal is unusable --------------------
+        if self.is_unusable(self.current_index):
+            self.alert_sound.stop()
+            self.ui.diagnosis_label.setText("Poor signal quality")
+            return
 
-        # --- 4. Heart-rate update using the two most recent passed peaks --------
+        # --- 5. Heart-rate update using the two most recent passed peaks --------
         if self.qrs_peaks is not None and len(self.qrs_peaks) > 1:
             # Peaks already behind (≤ current index)
-            passed = [p for p in self.qrs_peaks if p <= self.current_index]
+            n_passed = np.searchsorted(self.qrs_peaks, self.current_index, side='right')
 
-            if len(passed) >= 2:
-                last, prev = passed[-1], passed[-2]
-                rr = self.x_data[last] - self.x_data[prev]
+            if n_passed >= 2:
+                last, prev = self.qrs_peaks[n_passed - 1], self.qrs_peaks[n_passed - 2]
+                rr = (last - prev) / self.timebase.fs
                 if 0.3 < rr < 1.5:  # physiologically plausible
                     self.current_heart_rate = 60 / rr
                     self.update_heart_rate_display()
 
-        # --- 5. Auto-scroll window edge -----------------------------------------
-        if self.x_data[self.current_index] > self.current_window_start + self.window_size:
-            self.current_window_start = self.x_data[self.current_index] - self.window_size
+        # --- 6. Auto-scroll window edge -----------------------------------------
+        if self.timebase.time_of(self.current_index) > self.current_window_start + self.window_size:
+            self.current_window_start = self.timebase.time_of(self.current_index) - self.window_size
+
+    def is_unusable(self, index):
+        """True if a sample lies in a stretch masked by the signal-quality check."""
+        if self.unusable_intervals is None or len(self.unusable_intervals) == 0:
+            return False
+        i = np.searchsorted(self.unusable_intervals[:, 0], index, side='right') - 1
+        return i >= 0 and index < self.unusable_intervals[i, 1]
 
     def get_current_heart_rate(self):
         return self.current_heart_rate if self.current_heart_rate > 0 else None
@@ -311,10 +532,22 @@ class MainWindowController:
         """Reset the display and clear loaded data."""
         self.stop_playback()
         self.ui.ecg_plot_widget.clear()
-        self.x_data = None
+        self.ui.navigator_plot_widget.clear()
+        self.ui.navigator_plot_widget.addItem(self.ui.navigator_region)
+        self.ui.navigator_hr_view.clear()
+        self.timebase = None
         self.y_data = None
         self.filtered_signal = None
         self.qrs_peaks = None
+        self.annotation_times = None
+        self.annotation_index = None
+        self.episode_index = None
+        self.beat_labels = None
+        self.unusable_intervals = None
+        self.record_path = None
+        if self._shared_block is not None:
+            self.analysis_worker.release(self._shared_block)
+            self._shared_block = None
         self.current_window_start = 0
         self.current_heart_rate = 0
         self.heart_rate_history = []
@@ -355,5 +588,9 @@ class MainWindowController:
     def close_app(self):
         """Clean up and exit."""
         # self.stop_playback()
+        if self.review_queue is not None:
+            self.review_queue.close()
+        if self._analysis_worker is not None:
+            self._analysis_worker.close()
         self.app.quit()
         remove_directories()
@@ -1,7 +1,28 @@
+from functools import lru_cache
+
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtCore import QDateTime, QTimer
 import pyqtgraph as pg
 
+
+@lru_cache(maxsize=None)
+def text_symbol(text):
+    """
+    Text as a pyqtgraph scatter symbol (unit-sized, centred QPainterPath), so many
+    labels render through one ScatterPlotItem instead of one TextItem each.
+    """
+    path = QtGui.QPainterPath()
+    font = QtGui.QFont()
+    font.setPointSize(10)
+    path.addText(0, 0, font, text)
+    box = path.boundingRect()
+    scale = 1.0 / max(box.width(), box.height(), 1e-6)
+    transform = QtGui.QTransform()
+    transform.scale(scale, scale)
+    transform.translate(-box.x() - box.width() / 2, -box.y() - box.height() / 2)
+    return transform.map(path)
+
+
 COMMON_PUSHBUTTON_STYLESHEET = """
 QPushButton {
     color: white;
@@ -154,6 +175,31 @@ class Ui_MainWindow(object):
         group_box.setLayout(graph_layout)
         return plot_widget
 
+    def addNavigatorView(self, group_box, height):
+        """Overview strip below a graph: record envelope, HR trend overlay and a draggable window."""
+        navigator = pg.PlotWidget()
+        navigator.setFixedHeight(height)
+        navigator.setMouseEnabled(x=False, y=False)
+        navigator.hideButtons()
+        navigator.getAxis('left').setTicks([])
+        navigator.getAxis('left').setPen(None)
+        navigator.getAxis('bottom').setTextPen(pg.mkPen('#55b135'))
+
+        # Heart-rate trend gets its own y-scale, sharing the navigator's time axis
+        hr_view = pg.ViewBox()
+        hr_view.setMouseEnabled(x=False, y=False)
+        navigator.scene().addItem(hr_view)
+        hr_view.setXLink(navigator.getPlotItem())
+        navigator.getViewBox().sigResized.connect(
+            lambda: hr_view.setGeometry(navigator.getViewBox().sceneBoundingRect()))
+
+        region = pg.LinearRegionItem(values=(0, 5), brush=pg.mkBrush(85, 177, 53, 60))
+        region.setZValue(10)
+        navigator.addItem(region)
+
+        group_box.layout().addWidget(navigator)
+        return navigator, hr_view, region
+
     # ----------------------------------------------------------------
     # Setup Sections
     # ----------------------------------------------------------------
@@ -372,6 +418,37 @@ class Ui_MainWindow(object):
         )
         self.controller_buttons_layout.addWidget(self.clear_signal_button)
 
+        # Review queue: open a folder of records and step through them
+        self.open_queue_button = self.createButton(
+            text="Queue",
+            parent=self.horizontalLayoutWidget,
+            max_size=QtCore.QSize(120, 90),
+            stylesheet=COMMON_PUSHBUTTON_STYLESHEET,
+            object_name="open_queue_button",
+            cursor=QtCore.Qt.PointingHandCursor
+        )
+        self.controller_buttons_layout.addWidget(self.open_queue_button)
+
+        self.previous_record_button = self.createButton(
+            text="Previous",
+            parent=self.horizontalLayoutWidget,
+            max_size=QtCore.QSize(120, 90),
+            stylesheet=COMMON_PUSHBUTTON_STYLESHEET,
+            object_name="previous_record_button",
+            cursor=QtCore.Qt.PointingHandCursor
+        )
+        self.controller_buttons_layout.addWidget(self.previous_record_button)
+
+        self.next_record_button = self.createButton(
+            text="Next",
+            parent=self.horizontalLayoutWidget,
+            max_size=QtCore.QSize(120, 90),
+            stylesheet=COMMON_PUSHBUTTON_STYLESHEET,
+            object_name="next_record_button",
+            cursor=QtCore.Qt.PointingHandCursor
+        )
+        self.controller_buttons_layout.addWidget(self.next_record_button)
+
         quit_font = QtGui.QFont()
         quit_font.setFamily("Hiragino Sans GB")
         quit_font.setPointSize(50)
@@ -416,6 +493,10 @@ class Ui_MainWindow(object):
             style=self.groupbox_style,
             isGraph=True
         )
+        self.navigator_plot_widget, self.navigator_hr_view, self.navigator_region = self.addNavigatorView(
+            self.ecg_groupbox,
+            height=int(ecg_h * 0.22)
+        )
         self.groupboxes_layout.addWidget(self.ecg_groupbox)
 
         hr_w = int(gb_area_w * (230 / 1401.0))
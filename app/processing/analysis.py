@@ -0,0 +1,233 @@
+import os
+
+import numpy as np
+
+from app.processing.cascade import CascadeClassifier
+from app.processing.events import EventIndex, detect_episodes
+from app.processing.clustering import classify_clustered
+from app.processing.filtering import bandpass_filter
+from app.processing.multilead import filter_leads, detect_r_peaks_multilead
+from app.processing.pipeline import Pipeline, StageCache, content_key
+from app.processing.quality import window_quality, usable_windows, unusable_mask, mask_intervals
+from app.processing.resampling import resample_signal, RESAMPLE_CHUNK_SIZE
+from app.processing.segmentation import extract_beat_matrix, get_r_peaks
+from app.services.upload_signal import SignalFileUploader
+
+
+# Tunable parameters of the chain; analyze()/analyze_file() accept overrides by name
+ANALYSIS_PARAMS = {
+    "lowcut": 0.5,
+    "highcut": 40.0,
+    "filter_order": 2,
+    "window_size": 250,
+    "multilead": False,  # opt-in fused detection over all leads (biosppy on lead 0 has the better PPV)
+    "classification_mode": "cascade",  # "cascade" (RR/morphology screen first) or "cluster"
+    "cascade_params": {},  # CascadeClassifier settings, by name from CASCADE_PARAMS
+}
+# Screen settings of the cascade that can be tuned per analysis (see CascadeClassifier)
+CASCADE_PARAMS = ("rr_range", "max_qrs_width", "min_template_corr", "max_forward_ratio")
+
+
+class RecordAnalyzer:
+    """
+    Full processing chain for one record, run as a memoised stage DAG:
+    load -> resample -> filter -> quality / detect -> segment -> classify -> metrics,
+    where multi-lead WFDB records can be detected on all leads at once (multilead=True).
+
+    Stage outputs are cached by input key and parameters, so re-analysing a
+    record with e.g. a different filter band or classification mode only re-runs
+    the stages downstream of the change. Holds no per-record state, so one
+    instance can serve the GUI and background workers alike.
+    """
+
+    def __init__(self, classifier, classification_mode="cascade", cache=None, uncached_stages=()):
+        """
+        Args:
+            classifier (ECGClassifier): Beat classifier
+            classification_mode (str): Default classification mode
+            cache (StageCache): Stage cache, e.g. shared between analyzers
+            uncached_stages (tuple): Stages whose outputs are not kept in the cache
+        """
+        self.classifier = classifier
+        self.params = dict(ANALYSIS_PARAMS, classification_mode=classification_mode)
+
+        self.pipeline = Pipeline(cache if cache is not None else StageCache(), uncached=uncached_stages)
+        self.pipeline.add_stage("record", self._load_record, inputs=("file",))
+        self.pipeline.add_stage("resample", self._resample, inputs=("record",))
+        self.pipeline.add_stage("filter", self._filter, inputs=("resample",),
+                                params=("lowcut", "highcut", "filter_order"))
+        self.pipeline.add_stage("quality", self._quality, inputs=("resample", "filter"))
+        self.pipeline.add_stage("leads", SignalFileUploader.load_leads, inputs=("file",))
+        self.pipeline.add_stage("leads_resample", self._resample_leads, inputs=("leads",))
+        self.pipeline.add_stage("detect", self._detect, inputs=("resample", "filter", "leads_resample"),
+                                params=("lowcut", "highcut", "filter_order", "multilead"))
+        self.pipeline.add_stage("segment", self._segment, inputs=("filter", "detect", "quality"),
+                                params=("window_size",))
+        self.pipeline.add_stage("classify", self._classify, inputs=("segment",),
+                                params=("classification_mode", "cascade_params"))
+        self.pipeline.add_stage("metrics", self._metrics, inputs=("detect", "quality"))
+        self.pipeline.add_stage("annotations", self._annotations, inputs=("file", "record"))
+        self.pipeline.add_stage("events", self._events, inputs=("resample", "annotations", "segment", "classify"))
+
+    def analyze_file(self, path, **params):
+        """Load and analyze a record file; None if it cannot be loaded."""
+        stat = os.stat(path)
+        source = {"file": (("file", os.path.abspath(path), stat.st_mtime_ns, stat.st_size), path)}
+        if self.pipeline.run(["record"], source, self._params(params))["record"] is None:
+            return None
+        result = self._run(source, params)
+        result["file_path"] = path
+        return result
+
+    def analyze(self, timebase, signal, annotation_times=None, **params):
+        """
+        Args:
+            timebase (Timebase): Sampling grid of the loaded signal
+            signal (array): Raw samples
+            annotation_times (array): Optional reference annotation times (s)
+            **params: Overrides of ANALYSIS_PARAMS
+
+        Returns:
+            dict: timebase/raw_signal/filtered_signal at the model rate, qrs_peaks,
+                beat_peaks, beat_labels, classification_stats, unusable_intervals
+                (sample [start, stop) pairs), annotation_times, annotation_index /
+                episode_index (EventIndex of reference annotations / detected episodes)
+        """
+        record = (timebase, signal, annotation_times)
+        key = ("record", content_key(timebase.t0, timebase.fs, timebase.gaps, signal, annotation_times))
+        annotations = (("annotations", key), (annotation_times, None))
+        leads = (("leads", None), None)  # a bare signal is single-lead
+        return self._run({"record": (key, record), "annotations": annotations, "leads": leads}, params)
+
+    def _params(self, overrides):
+        unknown = set(overrides) - set(self.params)
+        if unknown:
+            raise ValueError(f"Unknown analysis parameters: {sorted(unknown)}")
+        params = dict(self.params, **overrides)
+
+        cascade_params = dict(params["cascade_params"])
+        unknown = set(cascade_params) - set(CASCADE_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown cascade parameters: {sorted(unknown)}")
+        if cascade_params.get("rr_range") is not None:
+            cascade_params["rr_range"] = tuple(cascade_params["rr_range"])
+        params["cascade_params"] = tuple(sorted(cascade_params.items()))  # hashable, for the stage cache key
+        return params
+
+    def _run(self, source, params):
+        computed = set()
+        out = self.pipeline.run(["record", "resample", "filter", "segment", "classify", "metrics", "events"],
+                                source, self._params(params), computed)
+        timebase, signal = out["resample"]
+        _, beat_peaks = out["segment"]
+        beat_labels, stats = out["classify"]
+        stats = dict(stats, cached="classify" not in computed)  # timings are from the original run
+        qrs_peaks, unusable_intervals = out["metrics"]
+        annotation_index, episode_index = out["events"]
+        return {
+            "file_path": None,
+            "timebase": timebase,
+            "raw_signal": signal,
+            "filtered_signal": out["filter"],
+            "qrs_peaks": qrs_peaks,
+            "beat_peaks": beat_peaks,
+            "beat_labels": beat_labels,
+            "classification_stats": stats,
+            "unusable_intervals": unusable_intervals,
+            "annotation_times": out["record"][2],
+            "annotation_index": annotation_index,
+            "episode_index": episode_index,
+        }
+
+    @staticmethod
+    def _load_record(path):
+        timebase, signal, annotation_times = SignalFileUploader.load_timed_signal(path)
+        if timebase is None or signal is None:
+            return None  # not cached: a file fixed on disk is read again
+        return timebase, signal, annotation_times
+
+    @staticmethod
+    def _resample(record):
+        # Bring every record to the model's native rate once, up front
+        timebase, signal, _ = record
+        signal, sampling_rate = resample_signal(signal, timebase.fs, chunk_size=RESAMPLE_CHUNK_SIZE)
+        return timebase.with_rate(sampling_rate, len(signal)), signal
+
+    @staticmethod
+    def _filter(resampled, lowcut, highcut, filter_order):
+        timebase, signal = resampled
+        return bandpass_filter(signal, lowcut=lowcut, highcut=highcut, fs=timebase.fs, order=filter_order)
+
+    @staticmethod
+    def _quality(resampled, filtered_signal):
+        # Mask noisy / flat / clipped stretches so detection, classification and alarms skip them,
+        # and stretches interpolated across timestamp gaps, which hold no measured signal
+        timebase, signal = resampled
+        quality = window_quality(signal, timebase.fs, filtered=filtered_signal)
+        unusable = unusable_mask(quality, usable_windows(quality), len(signal))
+        for start, stop in timebase.gaps:
+            unusable[start:stop] = True
+        return unusable
+
+    @staticmethod
+    def _resample_leads(leads):
+        if leads is None:
+            return None
+        fs, matrix = leads
+        matrix, sampling_rate = resample_signal(matrix, fs, chunk_size=RESAMPLE_CHUNK_SIZE)
+        return sampling_rate, matrix
+
+    @staticmethod
+    def _detect(resampled, filtered_signal, leads, lowcut, highcut, filter_order, multilead):
+        # One R-peak detection shared by segmentation and the heart-rate / plotting peaks
+        timebase, _ = resampled
+        if multilead and leads is not None:
+            # All leads filtered as one matrix and fused; peaks aligned to lead 0 (the analysed signal)
+            sampling_rate, matrix = leads
+            filtered_leads = filter_leads(matrix, sampling_rate, lowcut=lowcut, highcut=highcut, order=filter_order)
+            return detect_r_peaks_multilead(filtered_leads, sampling_rate)
+        return np.sort(get_r_peaks(filtered_signal, sampling_rate=timebase.fs))
+
+    @staticmethod
+    def _segment(filtered_signal, r_peaks, unusable, window_size):
+        beats, beat_peaks = extract_beat_matrix(filtered_signal, r_peaks, window_size=window_size)
+        keep = ~unusable[beat_peaks]
+        return beats[keep], beat_peaks[keep]
+
+    @staticmethod
+    def _metrics(r_peaks, unusable):
+        return r_peaks[~unusable[r_peaks]], mask_intervals(unusable)
+
+    @staticmethod
+    def _annotations(path, record):
+        times, labels = SignalFileUploader.load_annotation_events(path)
+        if times is None:
+            times = record[2]  # times only (.pss / CSV): unlabelled markers
+        return times, labels
+
+    @staticmethod
+    def _events(resampled, annotations, segmented, classified):
+        timebase, _ = resampled
+        times, labels = annotations
+        if times is None:
+            annotation_index = EventIndex.empty()
+        else:
+            annotation_index = EventIndex.from_points(times, labels if labels is not None else ["*"] * len(times))
+        _, beat_peaks = segmented
+        beat_labels, _ = classified
+        return annotation_index, detect_episodes(timebase.time_of(beat_peaks), beat_labels)
+
+    def _classify(self, segmented, classification_mode, cascade_params):
+        beats, beat_peaks = segmented
+        return self.classify_beats(beats, beat_peaks, classification_mode, dict(cascade_params))
+
+    def classify_beats(self, beats, beat_peaks, classification_mode=None, cascade_params=None):
+        """Classify every beat of the record with the selected strategy; returns (labels, stats)."""
+        if (classification_mode or self.params["classification_mode"]) == "cascade":
+            # A cascade per call: its settings and stats stay per analysis when analyses run concurrently
+            cascade = CascadeClassifier(self.classifier, **(cascade_params or self.params["cascade_params"]))
+            labels = cascade.predict_record(beats, beat_peaks)
+            return labels, cascade.stats
+
+        # Morphology templates: the CNN runs once per cluster
+        return classify_clustered(self.classifier, beats)
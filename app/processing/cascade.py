@@ -0,0 +1,118 @@
+import time
+
+import numpy as np
+
+from app.processing.resampling import MODEL_SAMPLING_RATE
+
+
+class CascadeClassifier:
+    """
+    Two-stage beat classifier.
+
+    Stage 1 is a vectorised screen over RR prematurity, QRS width and correlation
+    with the record's dominant beat; beats that pass every test are labelled
+    Normal without touching the CNN. Stage 2 sends only the remaining, ambiguous
+    beats to the wrapped ECGClassifier.
+    """
+
+    def __init__(self, classifier, sampling_rate=MODEL_SAMPLING_RATE, rr_range=(0.85, 1.2),
+                 max_qrs_width=0.12, min_template_corr=0.9, rr_context=8, max_forward_ratio=None):
+        """
+        Args:
+            classifier (ECGClassifier): Second-stage model
+            sampling_rate (float): Rate of the beats and R-peak indices (Hz)
+            rr_range (tuple): Accepted RR / local-mean-RR ratio for a normal beat
+            max_qrs_width (float): Widest QRS (s) still screened as normal
+            min_template_corr (float): Minimum correlation with the dominant beat
+            rr_context (int): Number of neighbouring RR intervals in the local mean
+            max_forward_ratio (float): Optional cap on the fraction of beats sent to
+                stage 2; the least confident beats are forwarded first
+        """
+        self.classifier = classifier
+        self.sampling_rate = sampling_rate
+        self.rr_range = rr_range
+        self.max_qrs_width = max_qrs_width
+        self.min_template_corr = min_template_corr
+        self.rr_context = rr_context
+        self.max_forward_ratio = max_forward_ratio
+        self.normal_label = classifier.label_map[0]
+        self.stats = {}
+
+    def screen_features(self, beats, r_peaks):
+        """RR prematurity ratio, QRS width (s) and dominant-template correlation per beat."""
+        beats = np.asarray(beats, dtype=np.float32)
+        r_peaks = np.asarray(r_peaks, dtype=np.float64)
+        n, length = beats.shape
+
+        # RR before each beat relative to the mean RR of its neighbours (the beat itself
+        # excluded); the window shrinks at the record edges instead of padding with zeros
+        if n < 2:
+            rr_ratio = np.full(n, np.nan)  # no RR interval: never screened as normal
+        else:
+            rr = np.diff(r_peaks, prepend=np.nan)
+            rr[0] = rr[1]
+            half = max(self.rr_context // 2, 1)
+            kernel = np.ones(2 * half + 1)
+            window_sum = np.convolve(rr, kernel)[half:half + n] - rr
+            window_count = np.convolve(np.ones(n), kernel)[half:half + n] - 1
+            rr_ratio = rr / (window_sum / window_count)
+
+        # QRS width: samples around the R-peak above 30 % of the beat's peak magnitude
+        center = length // 2
+        half_search = int(0.1 * self.sampling_rate)
+        qrs = np.abs(beats[:, max(center - half_search, 0):center + half_search])
+        qrs_width = (qrs >= 0.3 * qrs.max(axis=1, keepdims=True)).sum(axis=1) / self.sampling_rate
+
+        dominant = np.median(beats, axis=0)
+        dominant = (dominant - dominant.mean()) / (dominant.std() + 1e-6)
+        template_corr = beats @ dominant / length
+
+        return rr_ratio, qrs_width, template_corr
+
+    def predict_record(self, beats, r_peaks):
+        """
+        Classifies all beats of a record.
+
+        Args:
+            beats (array): (n_beats, length) z-normalised beats
+            r_peaks (array): R-peak index of every beat (same order)
+
+        Returns:
+            list: Label per beat
+        """
+        beats = np.asarray(beats, dtype=np.float32)
+        if len(beats) == 0:
+            self.stats = {"n_beats": 0, "n_forwarded": 0, "routing_ratio": 0.0,
+                          "stage1_sec": 0.0, "stage2_sec": 0.0}
+            return []
+
+        start = time.perf_counter()
+        rr_ratio, qrs_width, template_corr = self.screen_features(beats, r_peaks)
+        # Confidence margin: how far the weakest test is from its threshold (negative = fails)
+        margin = np.minimum.reduce([
+            rr_ratio - self.rr_range[0],
+            self.rr_range[1] - rr_ratio,
+            (self.max_qrs_width - qrs_width) / self.max_qrs_width,
+            template_corr - self.min_template_corr,
+        ])
+        margin = np.nan_to_num(margin, nan=-np.inf)
+        forward = np.flatnonzero(margin < 0)
+        if self.max_forward_ratio is not None:
+            budget = int(self.max_forward_ratio * len(beats))
+            forward = forward[np.argsort(margin[forward], kind="stable")[:budget]]
+        stage1_sec = time.perf_counter() - start
+
+        labels = np.full(len(beats), self.normal_label, dtype=object)
+        start = time.perf_counter()
+        if len(forward):
+            labels[forward] = self.classifier.predict_batch(beats[forward])
+        stage2_sec = time.perf_counter() - start
+
+        self.stats = {
+            "n_beats": len(beats),
+            "n_forwarded": len(forward),
+            "routing_ratio": len(forward) / len(beats),
+            "stage1_sec": stage1_sec,
+            "stage2_sec": stage2_sec,
+        }
+        return list(labels)
@@ -1,12 +1,24 @@
+import os
+
 import numpy as np
 from app.processing.model_loader import ModelLoader
 
+DEFAULT_MODEL_PATH = "models/arrhythmia_model.h5"
+
 
 class ECGClassifier:
     def __init__(self, model_path, model_type="keras", label_map=None):
         self.model = ModelLoader(model_path, model_type).get_model()
         self.label_map = label_map or {0: "Normal", 1: "AFib", 2: "PVC"}
 
+    @classmethod
+    def default(cls):
+        """The app's classifier: the shared inference server if PULSESPY_INFERENCE_SOCKET is set, else a local model."""
+        socket_path = os.environ.get("PULSESPY_INFERENCE_SOCKET")
+        if socket_path:
+            return cls(socket_path, model_type="remote")
+        return cls(DEFAULT_MODEL_PATH)
+
     def predict(self, ecg_signal):
         """
         Takes a NumPy array of ECG signal data and returns prediction label.
@@ -24,3 +36,19 @@ class ECGClassifier:
         predicted_index = np.argmax(pred, axis=1)[0]
 
         return self.label_map.get(predicted_index, f"Unknown ({predicted_index})")
+
+    def predict_batch(self, beats):
+        """
+        Classifies a whole (n_beats, length) matrix in one model call.
+        Returns a list of labels, one per beat.
+        """
+        batch = np.asarray(beats, dtype=np.float32)
+        if len(batch) == 0:
+            return []
+        if batch.ndim == 2:
+            batch = batch[..., np.newaxis]  # CNN style
+
+        pred = self.model.predict(batch, verbose=0)
+        predicted_indices = np.argmax(pred, axis=1)
+
+        return [self.label_map.get(i, f"Unknown ({i})") for i in predicted_indices]
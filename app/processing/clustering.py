@@ -0,0 +1,112 @@
+import numpy as np
+
+
+def cluster_beats(beats, threshold=0.95, block_size=512):
+    """
+    Incremental correlation-based template matching over a z-normalised beat matrix.
+
+    Beats are processed in blocks: each block is correlated against all current
+    templates with one matrix product; beats that match no template seed new
+    templates. Templates are the running mean of their members.
+
+    Args:
+        beats (array): (n_beats, length) z-normalised beats
+        threshold (float): Minimum Pearson correlation to join a template
+        block_size (int): Beats correlated per matrix product
+
+    Returns:
+        tuple: (cluster_ids, templates, counts)
+    """
+    beats = np.asarray(beats, dtype=np.float32)
+    n, length = beats.shape if beats.ndim == 2 else (0, 0)
+    cluster_ids = np.full(n, -1, dtype=np.int64)
+    sums = np.zeros((0, length), dtype=np.float64)
+    templates = np.zeros((0, length), dtype=np.float32)
+    counts = np.zeros(0, dtype=np.int64)
+
+    for start in range(0, n, block_size):
+        block = beats[start:start + block_size]
+        ids = np.full(len(block), -1, dtype=np.int64)
+
+        if len(templates):
+            corr = block @ templates.T / length
+            best = corr.argmax(axis=1)
+            matched = corr[np.arange(len(block)), best] >= threshold
+            ids[matched] = best[matched]
+
+        # Unmatched beats seed new templates, which may absorb later beats of the same block
+        pending = np.flatnonzero(ids < 0)
+        new_templates = []
+        while len(pending):
+            seed = pending[0]
+            corr = block[pending] @ block[seed] / length
+            members = pending[corr >= threshold]
+            members = members if seed in members else np.append(members, seed)
+            ids[members] = len(templates) + len(new_templates)
+            new_templates.append(seed)
+            pending = np.setdiff1d(pending, members, assume_unique=True)
+
+        if new_templates:
+            sums = np.vstack([sums, np.zeros((len(new_templates), length))])
+            counts = np.append(counts, np.zeros(len(new_templates), dtype=np.int64))
+
+        np.add.at(sums, ids, block)
+        counts += np.bincount(ids, minlength=len(counts))
+        cluster_ids[start:start + len(block)] = ids
+
+        # Re-normalise the running means so the dot product stays a correlation
+        means = sums / counts[:, None]
+        templates = ((means - means.mean(axis=1, keepdims=True)) /
+                     (means.std(axis=1, keepdims=True) + 1e-6)).astype(np.float32)
+
+    return cluster_ids, templates, counts
+
+
+def cluster_representatives(beats, cluster_ids, templates):
+    """Index of the member most correlated with its cluster template, for every cluster."""
+    beats = np.asarray(beats, dtype=np.float32)
+    fit = np.einsum("ij,ij->i", beats, templates[cluster_ids]) / beats.shape[1]
+    order = np.lexsort((-fit, cluster_ids))
+    _, first = np.unique(cluster_ids[order], return_index=True)
+    return order[first]
+
+
+def classify_clustered(classifier, beats, threshold=0.95, min_cluster_size=3):
+    """
+    Classifies a record's beats by running the model only on cluster representatives
+    and outliers (members of clusters smaller than min_cluster_size); labels are
+    propagated back to cluster members.
+
+    Args:
+        classifier (ECGClassifier): Loaded classifier
+        beats (array): (n_beats, length) z-normalised beats
+        threshold (float): Template correlation threshold
+        min_cluster_size (int): Smaller clusters are classified beat by beat
+
+    Returns:
+        tuple: (labels per beat, info dict with cluster and inference counts)
+    """
+    beats = np.asarray(beats, dtype=np.float32)
+    if len(beats) == 0:
+        return [], {"n_beats": 0, "n_clusters": 0, "n_inferred": 0}
+
+    cluster_ids, templates, counts = cluster_beats(beats, threshold=threshold)
+    representatives = cluster_representatives(beats, cluster_ids, templates)
+
+    outliers = np.flatnonzero(counts[cluster_ids] < min_cluster_size)
+    dominant = representatives[counts >= min_cluster_size]
+    to_infer = np.concatenate([dominant, outliers])
+    predicted = classifier.predict_batch(beats[to_infer])
+
+    labels = np.empty(len(beats), dtype=object)
+    cluster_labels = dict(zip(cluster_ids[dominant], predicted[:len(dominant)]))
+    dominant_members = counts[cluster_ids] >= min_cluster_size
+    labels[dominant_members] = [cluster_labels[c] for c in cluster_ids[dominant_members]]
+    labels[outliers] = predicted[len(dominant):]
+
+    info = {
+        "n_beats": len(beats),
+        "n_clusters": len(counts),
+        "n_inferred": len(to_infer),
+    }
+    return list(labels), info
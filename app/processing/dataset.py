@@ -0,0 +1,177 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from app.processing.evaluation import CONFUSION_LABELS, match_beats, reference_beats
+from app.processing.multilead import filter_leads, detect_r_peaks_multilead
+from app.processing.resampling import resample_signal, RESAMPLE_CHUNK_SIZE
+from app.processing.segmentation import get_r_peaks, extract_beat_matrix
+from app.services.upload_signal import SignalFileUploader
+
+# Label index = position in CONFUSION_LABELS, so 0-2 line up with ECGClassifier's label_map
+DATASET_LABELS = CONFUSION_LABELS
+
+BEATS_FILE = "beats.npy"
+LABELS_FILE = "labels.npy"
+RECORD_IDS_FILE = "record_ids.npy"
+INDEX_FILE = "records.json"
+
+
+def _filtered_record(record_name):
+    """Resampled, band-passed record: (fs_in, model_fs, (channels, samples) filtered leads)."""
+    fs, leads, _ = SignalFileUploader.read_wfdb_leads(record_name)
+    resampled, model_fs = resample_signal(leads, fs, chunk_size=RESAMPLE_CHUNK_SIZE)
+    return fs, model_fs, filter_leads(resampled, model_fs)
+
+
+def _reference_labels(record_name):
+    """Reference beat samples and label indices (see evaluation.reference_beats)."""
+    samples, labels = reference_beats(record_name)
+    if samples is None:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int8)
+    return samples, np.array([DATASET_LABELS.index(label) for label in labels], dtype=np.int8)
+
+
+def label_record(record_name, window_size=250, tolerance_sec=0.15):
+    """
+    Pass 1: detects R-peaks (fused over all leads) and pairs every beat that has a
+    full window with its reference annotation. Only indices are returned, so the
+    exporter can size its output exactly before any beat is extracted.
+
+    Returns:
+        tuple: (r_peaks at the model rate, label indices), both sorted by time;
+            empty when the record cannot be read or has no beat annotations
+    """
+    try:
+        fs, model_fs, filtered = _filtered_record(record_name)
+    except Exception as e:
+        print(f"WFDB load error: {e}")
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int8)
+    if filtered.shape[0] > 1:
+        peaks = detect_r_peaks_multilead(filtered, model_fs)
+    else:
+        peaks = np.sort(get_r_peaks(filtered[0], sampling_rate=model_fs))
+
+    half = window_size // 2
+    peaks = peaks[(peaks - half >= 0) & (peaks + half < filtered.shape[-1])]  # same rule as extract_beat_matrix
+
+    reference, labels = _reference_labels(record_name)
+    record_peaks = np.round(peaks * fs / model_fs).astype(np.int64)
+    det_idx, ref_idx = match_beats(record_peaks, reference, tolerance=int(round(tolerance_sec * fs)))
+    return peaks[det_idx], labels[ref_idx]
+
+
+def _write_record(record_name, peaks, start, out_dir, window_size):
+    """Pass 2 worker: extracts one record's beats straight into its slice of beats.npy."""
+    if len(peaks) == 0:
+        return 0
+    _, _, filtered = _filtered_record(record_name)
+    beats, kept = extract_beat_matrix(filtered[0], peaks, window_size=window_size)
+    if len(kept) != len(peaks):
+        raise RuntimeError(f"{record_name}: {len(peaks) - len(kept)} beats lost between passes")
+    out = np.load(os.path.join(out_dir, BEATS_FILE), mmap_mode="r+")
+    out[start:start + len(beats)] = beats
+    out.flush()
+    return len(beats)
+
+
+def export_beat_dataset(records, out_dir, window_size=250, tolerance_sec=0.15, workers=None):
+    """
+    Exports labelled beats of many WFDB records into memory-mapped .npy files.
+
+    Pass 1 labels every record in parallel and returns only peak indices and
+    labels; beats.npy / labels.npy / record_ids.npy are then preallocated with
+    open_memmap at their exact final size, and pass 2 workers write each record's
+    z-normalised beats directly into its own slice, so the beat matrix never
+    has to fit in RAM.
+
+    Args:
+        records (list): WFDB record paths without extension
+        out_dir (str): Output directory
+        window_size (int): Samples per beat at the model rate
+        tolerance_sec (float): Beat-to-annotation matching tolerance
+        workers (int): Worker processes (defaults to CPU count)
+
+    Returns:
+        dict: Per-label beat counts and the number of beats / records written
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    n = len(records)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        labelled = list(pool.map(label_record, records, [window_size] * n, [tolerance_sec] * n))
+
+        counts = np.array([len(peaks) for peaks, _ in labelled], dtype=np.int64)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        total = int(counts.sum())
+
+        open_memmap(os.path.join(out_dir, BEATS_FILE), mode="w+", dtype=np.float32, shape=(total, window_size)).flush()
+        labels = open_memmap(os.path.join(out_dir, LABELS_FILE), mode="w+", dtype=np.int8, shape=(total,))
+        record_ids = open_memmap(os.path.join(out_dir, RECORD_IDS_FILE), mode="w+", dtype=np.int32, shape=(total,))
+        for record_id, ((_, record_labels), start) in enumerate(zip(labelled, starts)):
+            labels[start:start + len(record_labels)] = record_labels
+            record_ids[start:start + len(record_labels)] = record_id
+        labels.flush()
+        record_ids.flush()
+
+        written = list(pool.map(_write_record, records, [peaks for peaks, _ in labelled], starts,
+                                [out_dir] * n, [window_size] * n))
+
+    with open(os.path.join(out_dir, INDEX_FILE), "w") as f:
+        json.dump({"records": [os.path.basename(r) for r in records], "labels": DATASET_LABELS,
+                   "window_size": window_size, "counts": counts.tolist()}, f, indent=2)
+
+    return {
+        "records": n,
+        "beats": int(sum(written)),
+        "per_label": dict(zip(DATASET_LABELS, np.bincount(labels, minlength=len(DATASET_LABELS)).tolist())),
+    }
+
+
+def load_beat_dataset(directory):
+    """Memory-mapped (beats, labels, record_ids) of an exported dataset plus its index."""
+    with open(os.path.join(directory, INDEX_FILE)) as f:
+        index = json.load(f)
+    arrays = [np.load(os.path.join(directory, name), mmap_mode="r")
+              for name in (BEATS_FILE, LABELS_FILE, RECORD_IDS_FILE)]
+    return (*arrays, index)
+
+
+def iter_beat_batches(directory, batch_size=256, shuffle=True, seed=None, record_ids=None, block_size=65536):
+    """
+    Streams (beats, labels) training batches from an exported dataset.
+
+    Shuffling is two-level to keep reads sequential: contiguous blocks of
+    block_size beats are visited in random order and shuffled in memory, so only
+    one block is resident at a time. Beats come out as (batch, length, 1) float32.
+
+    Args:
+        directory (str): Dataset written by export_beat_dataset
+        batch_size (int): Beats per batch
+        shuffle (bool): Randomise block and beat order
+        seed (int): Seed for reproducible epochs
+        record_ids (list): Optional record ids to keep (e.g. a train/validation split by record)
+        block_size (int): Beats read per block
+
+    Yields:
+        tuple: (beats, labels)
+    """
+    beats, labels, ids, _ = load_beat_dataset(directory)
+    rng = np.random.default_rng(seed)
+    block_starts = np.arange(0, len(labels), block_size)
+    if shuffle:
+        rng.shuffle(block_starts)
+
+    for start in block_starts:
+        block_labels = np.asarray(labels[start:start + block_size])
+        order = np.arange(len(block_labels))
+        if record_ids is not None:
+            order = order[np.isin(ids[start:start + block_size], record_ids)]
+        if shuffle:
+            rng.shuffle(order)
+        block_beats = np.asarray(beats[start:start + block_size])
+        for i in range(0, len(order), batch_size):
+            batch = order[i:i + batch_size]
+            yield block_beats[batch][..., np.newaxis], block_labels[batch]
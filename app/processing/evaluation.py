@@ -0,0 +1,231 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.processing.filtering import bandpass_filter
+from app.processing.multilead import filter_leads, detect_r_peaks_multilead
+from app.processing.resampling import resample_signal, RESAMPLE_CHUNK_SIZE
+from app.processing.segmentation import get_r_peaks, extract_beat_matrix
+from app.services.upload_signal import SignalFileUploader
+
+# MIT-BIH beat annotation symbols mapped onto the classifier's label space.
+# Non-beat annotations (rhythm changes '+', noise '~', artifacts '|', ...) are ignored.
+REFERENCE_LABELS = {
+    "N": "Normal", "L": "Normal", "R": "Normal", "e": "Normal", "j": "Normal",
+    "V": "PVC", "E": "PVC",
+    "A": "Other", "a": "Other", "J": "Other", "S": "Other",
+    "F": "Other", "/": "Other", "f": "Other", "Q": "Other",
+}
+CONFUSION_LABELS = ["Normal", "AFib", "PVC", "Other"]
+AFIB_RHYTHM = "AFIB"  # aux note of '(AFIB' rhythm annotations, as returned by load_annotation_events
+
+# Classifier instance owned by each worker process (loaded once per process)
+_worker_classifier = None
+
+
+def reference_beats(record_name):
+    """
+    Reference beats of a WFDB record in the classifier's label space. AFib has no
+    beat symbol of its own: Normal beats inside '(AFIB' rhythm episodes (a '+'
+    annotation holds until the next one) are labelled AFib.
+
+    Returns:
+        tuple: (sample indices, array of labels), or (None, None) if unreadable
+    """
+    samples, symbols = SignalFileUploader.load_wfdb_annotations(record_name)
+    _, events = SignalFileUploader.load_annotation_events(record_name + ".atr")  # '+' carries its aux note
+    if samples is None or events is None:
+        return None, None
+
+    rhythm_at = np.maximum.accumulate(np.where(symbols == "+", np.arange(len(symbols)), -1))
+    in_afib = (rhythm_at >= 0) & (events[np.maximum(rhythm_at, 0)] == AFIB_RHYTHM)
+
+    is_beat = np.isin(symbols, list(REFERENCE_LABELS))
+    labels = np.array([REFERENCE_LABELS[s] for s in symbols[is_beat]], dtype=object)
+    labels[(labels == "Normal") & in_afib[is_beat]] = "AFib"
+    return samples[is_beat], labels
+
+
+def match_beats(detected, reference, tolerance):
+    """
+    One-to-one matching of detected beats to reference annotations.
+
+    Uses a vectorised merge of the two sorted sample arrays: every reference is
+    paired with its nearest detection, and pairs are accepted closest-first so
+    that each detection is used at most once.
+
+    Args:
+        detected (array): Detected R-peak sample indices
+        reference (array): Reference annotation sample indices
+        tolerance (int): Maximum distance (in samples) for a match
+
+    Returns:
+        tuple: (detected_idx, reference_idx) index arrays of the matched pairs
+    """
+    detected = np.sort(np.asarray(detected, dtype=np.int64))
+    reference = np.asarray(reference, dtype=np.int64)
+    if len(detected) == 0 or len(reference) == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty
+
+    right = np.clip(np.searchsorted(detected, reference), 0, len(detected) - 1)
+    left = np.clip(right - 1, 0, len(detected) - 1)
+    use_left = np.abs(detected[left] - reference) < np.abs(detected[right] - reference)
+    nearest = np.where(use_left, left, right)
+    distance = np.abs(detected[nearest] - reference)
+
+    candidates = np.flatnonzero(distance <= tolerance)
+    candidates = candidates[np.argsort(distance[candidates], kind="stable")]
+    _, first = np.unique(nearest[candidates], return_index=True)
+    reference_idx = np.sort(candidates[first])
+    return nearest[reference_idx], reference_idx
+
+
+def confusion_matrix(reference_labels, predicted_labels, labels=CONFUSION_LABELS):
+    """Rows are reference labels, columns are predicted labels."""
+    lookup = {label: i for i, label in enumerate(labels)}
+    rows = np.array([lookup[label] for label in reference_labels], dtype=np.int64)
+    cols = np.array([lookup.get(label, -1) for label in predicted_labels], dtype=np.int64)
+    keep = cols >= 0
+    counts = np.bincount(rows[keep] * len(labels) + cols[keep], minlength=len(labels) ** 2)
+    return counts.reshape(len(labels), len(labels))
+
+
+def detection_metrics(true_positives, n_reference, n_detected):
+    """Sensitivity (Se) and positive predictive value (PPV) of beat detection."""
+    return {
+        "sensitivity": true_positives / n_reference if n_reference else 0.0,
+        "ppv": true_positives / n_detected if n_detected else 0.0,
+    }
+
+
+def _init_worker(model_path):
+    global _worker_classifier
+    if model_path:
+        from app.processing.classifier import ECGClassifier
+        _worker_classifier = ECGClassifier(model_path)
+
+
+def evaluate_record(record_name, tolerance_sec=0.15, window_size=250, multilead=False):
+    """
+    Runs filtering, R-peak detection and classification over one WFDB record
+    and scores it against the record's .atr annotations.
+
+    Args:
+        record_name (str): WFDB record path without extension
+        tolerance_sec (float): Matching window for detected vs. reference beats
+        window_size (int): Beat window size passed to the classifier
+        multilead (bool): Detect R-peaks on all leads (fused) instead of biosppy on lead 0
+
+    Returns:
+        dict: Per-record counts, Se/PPV, confusion matrix and throughput
+    """
+    try:
+        fs, leads, _ = SignalFileUploader.read_wfdb_leads(record_name)
+    except Exception as e:
+        print(f"WFDB load error: {e}")
+        return None
+    reference, reference_labels = reference_beats(record_name)
+    if reference is None:
+        return None
+    if len(reference) == 0:
+        return None  # record carries no beat annotations to score against
+
+    signal = leads[0]
+    start = time.perf_counter()
+    if multilead:
+        resampled, model_fs = resample_signal(leads, fs, chunk_size=RESAMPLE_CHUNK_SIZE)
+        filtered_leads = filter_leads(resampled, model_fs)
+        filtered = filtered_leads[0]
+        model_peaks = detect_r_peaks_multilead(filtered_leads, model_fs)
+    else:
+        resampled, model_fs = resample_signal(signal, fs, chunk_size=RESAMPLE_CHUNK_SIZE)
+        filtered = bandpass_filter(resampled, fs=model_fs)
+        model_peaks = get_r_peaks(filtered, sampling_rate=model_fs)
+    beats, beat_peaks = extract_beat_matrix(filtered, model_peaks, window_size=window_size)
+    predicted = _worker_classifier.predict_batch(beats) if _worker_classifier is not None else None
+    elapsed = time.perf_counter() - start
+
+    # Score in the record's own sample grid, where the annotations live
+    r_peaks = np.round(np.asarray(model_peaks) * fs / model_fs).astype(np.int64)
+    beat_peaks = np.round(beat_peaks * fs / model_fs).astype(np.int64)
+
+    det_idx, ref_idx = match_beats(r_peaks, reference, tolerance=int(round(tolerance_sec * fs)))
+    result = {
+        "record": os.path.basename(record_name),
+        "n_samples": len(signal),
+        "n_reference": len(reference),
+        "n_detected": len(r_peaks),
+        "true_positives": len(det_idx),
+        "elapsed_sec": elapsed,
+        "samples_per_sec": len(signal) / elapsed if elapsed > 0 else 0.0,
+        "confusion": None,
+    }
+    result.update(detection_metrics(len(det_idx), len(reference), len(r_peaks)))
+
+    if predicted is not None:
+        # Only matched beats that produced a full classification window are scored
+        matched_peaks = np.sort(r_peaks)[det_idx]
+        has_beat = np.isin(matched_peaks, beat_peaks)
+        beat_pos = np.searchsorted(beat_peaks, matched_peaks[has_beat])
+        result["confusion"] = confusion_matrix(
+            [reference_labels[i] for i in ref_idx[has_beat]],
+            [predicted[i] for i in beat_pos],
+        )
+    return result
+
+
+def summarize(results):
+    """Aggregates per-record results into gross (beat-weighted) statistics."""
+    results = [r for r in results if r is not None]
+    tp = sum(r["true_positives"] for r in results)
+    n_ref = sum(r["n_reference"] for r in results)
+    n_det = sum(r["n_detected"] for r in results)
+    samples = sum(r["n_samples"] for r in results)
+    elapsed = sum(r["elapsed_sec"] for r in results)
+
+    summary = {
+        "records": len(results),
+        "true_positives": tp,
+        "n_reference": n_ref,
+        "n_detected": n_det,
+        "samples_per_sec": samples / elapsed if elapsed > 0 else 0.0,
+        "confusion": None,
+    }
+    summary.update(detection_metrics(tp, n_ref, n_det))
+    confusions = [r["confusion"] for r in results if r["confusion"] is not None]
+    if confusions:
+        summary["confusion"] = np.sum(confusions, axis=0)
+    return summary
+
+
+def find_records(directory):
+    """Lists WFDB record names (paths without extension) that have .atr annotations."""
+    headers = sorted(glob.glob(os.path.join(directory, "*.hea")))
+    records = [os.path.splitext(h)[0] for h in headers]
+    return [r for r in records if os.path.exists(r + ".atr")]
+
+
+def evaluate_directory(directory, model_path=None, tolerance_sec=0.15, workers=None, multilead=False):
+    """
+    Evaluates every annotated WFDB record in a directory in parallel.
+
+    Args:
+        directory (str): Folder containing .hea/.dat/.atr files
+        model_path (str): Keras model to classify beats with; detection only if None
+        tolerance_sec (float): Beat matching tolerance in seconds
+        workers (int): Number of worker processes (defaults to CPU count)
+        multilead (bool): Use fused multi-lead R-peak detection
+
+    Returns:
+        tuple: (per_record_results, summary)
+    """
+    records = find_records(directory)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+        n = len(records)
+        results = list(pool.map(evaluate_record, records, [tolerance_sec] * n, [250] * n, [multilead] * n))
+    results = [r for r in results if r is not None]
+    return results, summarize(results)
@@ -0,0 +1,71 @@
+import numpy as np
+
+# Detected episodes are widened by this much on each side so single-beat events stay visible
+EPISODE_PAD_SEC = 0.2
+
+
+class EventIndex:
+    """
+    Sorted-array index over labelled time intervals (points have start == stop).
+
+    Events are kept sorted by start together with the running maximum of their
+    stops, which is monotonic; a window query is then two binary searches plus
+    a scan of the k candidates, O(log n + k), whatever the number of events.
+    """
+
+    def __init__(self, starts, stops, labels):
+        """
+        Args:
+            starts (array): Event start times (s)
+            stops (array): Event stop times (s), >= starts
+            labels (array): Text label per event
+        """
+        starts = np.asarray(starts, dtype=np.float64)
+        order = np.argsort(starts, kind="stable")
+        self.starts = starts[order]
+        self.stops = np.asarray(stops, dtype=np.float64)[order]
+        self.labels = np.asarray(labels, dtype=object)[order]
+        self._max_stop = np.maximum.accumulate(self.stops) if len(self.stops) else self.stops
+
+    @classmethod
+    def from_points(cls, times, labels):
+        return cls(times, times, labels)
+
+    @classmethod
+    def empty(cls):
+        return cls([], [], [])
+
+    def __len__(self):
+        return len(self.starts)
+
+    def query(self, t_start, t_end):
+        """Indices of the events overlapping [t_start, t_end], in start order."""
+        first = np.searchsorted(self._max_stop, t_start, side="left")
+        last = np.searchsorted(self.starts, t_end, side="right")
+        candidates = np.arange(first, max(first, last))
+        return candidates[self.stops[first:last] >= t_start]
+
+
+def detect_episodes(beat_times, beat_labels, normal_label="Normal", pad_sec=EPISODE_PAD_SEC):
+    """
+    Merges runs of consecutive beats sharing the same non-normal label into episodes.
+
+    Args:
+        beat_times (array): Time of every classified beat (s), ascending
+        beat_labels (list): Label per beat
+        normal_label (str): Label that never forms an episode
+        pad_sec (float): Margin added before the first and after the last beat of a run
+
+    Returns:
+        EventIndex: One interval per episode, labelled with the beat label
+    """
+    beat_times = np.asarray(beat_times, dtype=np.float64)
+    labels = np.asarray(beat_labels, dtype=object)
+    if len(labels) == 0:
+        return EventIndex.empty()
+
+    run_starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    run_stops = np.r_[run_starts[1:], len(labels)] - 1
+    abnormal = labels[run_starts] != normal_label
+    run_starts, run_stops = run_starts[abnormal], run_stops[abnormal]
+    return EventIndex(beat_times[run_starts] - pad_sec, beat_times[run_stops] + pad_sec, labels[run_starts])
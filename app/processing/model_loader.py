@@ -1,26 +1,70 @@
 import os
+import threading
 
-# For Scikit-learn models
-import joblib
+import numpy as np
 
-# For Keras models
-from tensorflow.keras.models import load_model as keras_load_model
+# Post-training-quantised variants written by app/utils/quantize_model.py next to the float model
+QUANTIZED_MODEL_TYPES = ("int8", "float16")
+
+
+def quantized_model_path(model_path, variant):
+    """models/arrhythmia_model.h5 -> models/arrhythmia_model_int8.tflite"""
+    return f"{os.path.splitext(model_path)[0]}_{variant}.tflite"
+
+
+class TFLiteModel:
+    """Wraps a TFLite interpreter behind the Keras-style predict(batch) used by ECGClassifier."""
+
+    def __init__(self, model_path):
+        try:
+            from ai_edge_litert.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        self.interpreter = Interpreter(model_path=model_path)
+        self.input_index = self.interpreter.get_input_details()[0]["index"]
+        self.output_index = self.interpreter.get_output_details()[0]["index"]
+        self._batch_size = None
+        self._lock = threading.Lock()  # an interpreter must not be driven from two threads at once
+
+    def predict(self, batch, verbose=0):
+        batch = np.asarray(batch, dtype=np.float32)
+        with self._lock:
+            if batch.shape[0] != self._batch_size:
+                self.interpreter.resize_tensor_input(self.input_index, list(batch.shape))
+                self.interpreter.allocate_tensors()
+                self._batch_size = batch.shape[0]
+            self.interpreter.set_tensor(self.input_index, batch)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self.output_index)
 
 
 class ModelLoader:
     def __init__(self, model_path, model_type="keras"):
-        self.model_path = model_path
         self.model_type = model_type.lower()
+        if self.model_type in QUANTIZED_MODEL_TYPES:
+            model_path = quantized_model_path(model_path, self.model_type)
+        self.model_path = model_path
         self.model = self._load()
 
     def _load(self):
         if not os.path.exists(self.model_path):
             raise FileNotFoundError(f"Model file not found: {self.model_path}")
 
+        if self.model_type == "remote":
+            # model_path is the Unix socket of a running app/utils/serve_model.py
+            from app.services.inference_server import RemoteModel
+            return RemoteModel(self.model_path)
+
+        # Framework imports are deferred to here: TensorFlow alone takes seconds to import
         if self.model_type == "keras":
+            from tensorflow.keras.models import load_model as keras_load_model
             return keras_load_model(self.model_path)
         elif self.model_type == "sklearn":
+            import joblib
             return joblib.load(self.model_path)
+        elif self.model_type == "tflite" or self.model_type in QUANTIZED_MODEL_TYPES:
+            return TFLiteModel(self.model_path)
         else:
             raise ValueError(f"Unsupported model type: {self.model_type}")
 
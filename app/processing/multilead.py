@@ -0,0 +1,128 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import find_peaks
+
+from app.processing.filtering import bandpass_filter
+
+# Fused detection function is normalised per block so a typical QRS scores ~1
+DETECTION_THRESHOLD = 0.35
+REFRACTORY_SEC = 0.25  # no two R-peaks closer than this (HR <= 240 bpm)
+# A candidate this soon after a beat is taken for its T wave unless its energy is comparable
+T_WAVE_WINDOW_SEC = 0.36
+T_WAVE_ENERGY_RATIO = 0.5
+
+
+def _blocks(matrix, block):
+    """(channels, samples) -> (channels, n_blocks, block), reflect-padding the last block."""
+    n = matrix.shape[-1]
+    n_blocks = -(-n // block)
+    pad = n_blocks * block - n
+    if pad:
+        matrix = np.pad(matrix, ((0, 0), (0, pad)), mode="reflect" if pad < n else "edge")
+    return matrix.reshape(matrix.shape[0], n_blocks, block)
+
+
+def fused_detection_function(filtered, fs, block_sec=2.0, integration_sec=0.12):
+    """
+    Quality-weighted fusion of per-lead QRS energy, computed on the whole
+    (channels, samples) matrix at once.
+
+    Every lead's slope energy (squared derivative, moving-window integrated) is
+    scaled by the median of neighbouring blocks' maxima, so each lead's QRS
+    complexes score ~1, then averaged across leads with per-block weights from
+    the band-passed signal's excess kurtosis: a lead drowned in Gaussian-like
+    noise in some block contributes ~nothing there.
+
+    Args:
+        filtered (array): Band-passed (channels, samples) matrix (or a 1D lead)
+        fs (float): Sampling rate (Hz)
+        block_sec (float): Length of the normalisation / weighting blocks (s)
+        integration_sec (float): Moving-window integration width (s)
+
+    Returns:
+        array: 1D fused detection function, one value per sample
+    """
+    filtered = np.atleast_2d(np.asarray(filtered, dtype=np.float64))
+    n = filtered.shape[-1]
+
+    # Centred moving-window integration of the squared slope, as one cumsum per lead
+    width = max(1, int(round(integration_sec * fs)))
+    energy = np.cumsum(np.pad(np.gradient(filtered, axis=-1) ** 2, ((0, 0), (width // 2 + 1, width))), axis=-1)
+    energy = (energy[:, width:width + n] - energy[:, :n]) / width
+
+    block = max(1, int(round(block_sec * fs)))
+    energy_blocks = _blocks(energy, block)
+    scale = np.pad(energy_blocks.max(axis=2), ((0, 0), (1, 1)), mode="edge")
+    scale = np.median(sliding_window_view(scale, 3, axis=1), axis=2)
+
+    signal_blocks = _blocks(filtered, block)
+    centered = signal_blocks - signal_blocks.mean(axis=2, keepdims=True)
+    variance = np.mean(centered ** 2, axis=2)
+    kurtosis = np.mean(centered ** 4, axis=2) / np.maximum(variance ** 2, 1e-24)
+    weight = np.clip(kurtosis - 3.0, 0.0, None)
+
+    # Blocks where no lead is peaked (all kurtosis <= 3) fall back to equal weights
+    # instead of fusing to 0, which would drop every beat in them
+    weight[:, weight.sum(axis=0) == 0] = 1.0
+
+    normalised = energy_blocks / np.maximum(scale, 1e-24)[..., None]
+    fused = (normalised * weight[..., None]).sum(axis=0) / np.maximum(weight.sum(axis=0), 1e-12)[:, None]
+    return fused.reshape(-1)[:n]
+
+
+def _reject_t_waves(candidates, heights, window, ratio):
+    """
+    Of two candidates closer than `window` samples, drops the one with under `ratio`
+    of the other's energy: a T wave after a beat, or noise just before one.
+    """
+    keep = np.ones(len(candidates), dtype=bool)
+    last = 0
+    for i in range(1, len(candidates)):
+        if candidates[i] - candidates[last] < window:
+            if heights[i] < ratio * heights[last]:
+                keep[i] = False
+                continue
+            if heights[last] < ratio * heights[i]:
+                keep[last] = False
+        last = i
+    return candidates[keep]
+
+
+def detect_r_peaks_multilead(filtered, fs, reference_lead=0, threshold=DETECTION_THRESHOLD,
+                             refractory_sec=REFRACTORY_SEC, search_sec=0.08,
+                             t_wave_sec=T_WAVE_WINDOW_SEC, t_wave_ratio=T_WAVE_ENERGY_RATIO):
+    """
+    Locates R-peaks once for the whole record from the fused detection function,
+    rejects T waves and noise (a low-energy candidate right next to a beat), then snaps each
+    beat onto the largest deflection of the reference lead.
+
+    Args:
+        filtered (array): Band-passed (channels, samples) matrix
+        fs (float): Sampling rate (Hz)
+        reference_lead (int): Lead the returned indices are aligned to
+        threshold (float): Minimum fused detection value of a beat
+        refractory_sec (float): Minimum spacing between beats (s)
+        search_sec (float): Half-width of the snapping window (s)
+        t_wave_sec (float): Window after a beat in which weaker candidates may be T waves (s)
+        t_wave_ratio (float): Energy relative to the previous beat below which they are rejected
+
+    Returns:
+        array: Sorted R-peak sample indices
+    """
+    filtered = np.atleast_2d(np.asarray(filtered, dtype=np.float64))
+    fused = fused_detection_function(filtered, fs)
+    candidates, properties = find_peaks(fused, height=threshold, distance=max(1, int(refractory_sec * fs)))
+    if len(candidates) == 0:
+        return candidates
+    candidates = _reject_t_waves(candidates, properties["peak_heights"], int(round(t_wave_sec * fs)), t_wave_ratio)
+
+    half = int(round(search_sec * fs))
+    lead = np.pad(np.abs(filtered[reference_lead]), half, mode="constant", constant_values=-np.inf)
+    windows = candidates[:, None] + np.arange(2 * half + 1)
+    peaks = candidates - half + lead[windows].argmax(axis=1)
+    return np.unique(np.clip(peaks, 0, filtered.shape[-1] - 1))
+
+
+def filter_leads(leads, fs, lowcut=0.5, highcut=40.0, order=2):
+    """Band-pass every lead of a (channels, samples) matrix in one call."""
+    return bandpass_filter(leads, lowcut=lowcut, highcut=highcut, fs=fs, order=order)
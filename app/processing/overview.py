@@ -0,0 +1,50 @@
+import numpy as np
+
+
+def compute_envelope(signal, n_bins=2000):
+    """
+    Min/max envelope of a whole record in one vectorised pass.
+
+    Args:
+        signal (array): Full 1D signal
+        n_bins (int): Number of envelope columns (about one per screen pixel)
+
+    Returns:
+        tuple: (bin_start_indices, bin_min, bin_max)
+    """
+    signal = np.asarray(signal)
+    bin_size = max(1, int(np.ceil(len(signal) / n_bins)))
+    n_full = len(signal) // bin_size
+
+    blocks = signal[:n_full * bin_size].reshape(n_full, bin_size)
+    mins, maxs = blocks.min(axis=1), blocks.max(axis=1)
+    if n_full * bin_size < len(signal):
+        tail = signal[n_full * bin_size:]
+        mins = np.append(mins, tail.min())
+        maxs = np.append(maxs, tail.max())
+
+    starts = np.arange(len(mins)) * bin_size
+    return starts, mins, maxs
+
+
+def envelope_polyline(times, mins, maxs):
+    """Interleaves min/max into one zig-zag line so the envelope draws as a single curve."""
+    x = np.repeat(times, 2)
+    y = np.empty(2 * len(mins), dtype=np.result_type(mins, maxs))
+    y[0::2], y[1::2] = mins, maxs
+    return x, y
+
+
+def heart_rate_trend(qrs_peaks, fs, min_rr=0.3, max_rr=1.5):
+    """
+    Beat-to-beat heart rate over the record.
+
+    Returns:
+        tuple: (peak sample indices, BPM) for physiologically plausible RR intervals
+    """
+    qrs_peaks = np.asarray(qrs_peaks)
+    if len(qrs_peaks) < 2:
+        return np.array([], dtype=np.int64), np.array([])
+    rr = np.diff(qrs_peaks) / fs
+    valid = (rr > min_rr) & (rr < max_rr)
+    return qrs_peaks[1:][valid], 60 / rr[valid]
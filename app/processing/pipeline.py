@@ -0,0 +1,149 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def content_key(*values):
+    """Digest of arrays / scalars / None, used as the cache key of a pipeline source."""
+    digest = hashlib.blake2b(digest_size=16)
+    for value in values:
+        if isinstance(value, np.ndarray):
+            value = np.ascontiguousarray(value)
+            digest.update(f"{value.dtype}{value.shape}".encode())
+            digest.update(value.data)
+        else:
+            digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+
+def output_nbytes(value):
+    """Memory held by the arrays inside a stage output (nested tuples / lists / dicts)."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(output_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(output_nbytes(v) for v in value.values())
+    return 0
+
+
+class StageCache:
+    """
+    Thread-safe LRU of stage outputs bounded by an entry count and a memory budget.
+    None outputs (failed loads) are not cached, so a fixed file is read again.
+    """
+
+    def __init__(self, max_entries=64, memory_budget_mb=256):
+        self.max_entries = max_entries
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self._entries = OrderedDict()  # key -> (value, nbytes), least recently used first
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        # Computed outside the lock so independent records can run concurrently
+        value = compute()
+        nbytes = output_nbytes(value)
+        if value is None:
+            return value
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (value, nbytes)
+                self._nbytes += nbytes
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries
+                                              or self._nbytes > self.memory_budget):
+                _, (_, dropped) = self._entries.popitem(last=False)
+                self._nbytes -= dropped
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+
+class Pipeline:
+    """
+    Small DAG of named processing stages with memoised outputs.
+
+    A stage's cache key is built from its name, the keys of its inputs and the
+    values of the parameters it declares, so keys are known before anything
+    runs: changing a downstream parameter re-runs only the stages that depend
+    on it, and upstream outputs are not even fetched when a downstream key hits.
+    """
+
+    def __init__(self, cache=None, uncached=()):
+        """
+        Args:
+            cache (StageCache): Shared output cache (a private one if omitted)
+            uncached (tuple): Stages recomputed on every run instead of cached, for
+                outputs the caller keeps elsewhere (e.g. published to shared memory)
+        """
+        self.cache = cache if cache is not None else StageCache()
+        self.uncached = frozenset(uncached)
+        self.stages = {}  # name -> (func, input names, parameter names)
+
+    def add_stage(self, name, func, inputs=(), params=()):
+        """
+        Args:
+            name (str): Stage name
+            func (callable): Called as func(*input_outputs, **declared_params)
+            inputs (tuple): Names of upstream stages or sources
+            params (tuple): Names of the parameters the stage depends on
+        """
+        self.stages[name] = (func, tuple(inputs), tuple(params))
+
+    def run(self, targets, sources, params, computed=None):
+        """
+        Evaluates the target stages.
+
+        Args:
+            targets (list): Stage names to evaluate
+            sources (dict): name -> (key, value) for externally supplied inputs
+            params (dict): Parameter values for all stages
+            computed (set): Optional; receives the names of the stages actually run
+                (the others were served from the cache)
+
+        Returns:
+            dict: name -> output for every target
+        """
+        keys = {}
+        values = {name: value for name, (_, value) in sources.items()}
+
+        def key_of(name):
+            if name not in keys:
+                if name in sources:
+                    keys[name] = sources[name][0]
+                else:
+                    _, inputs, names = self.stages[name]
+                    keys[name] = (name, tuple(key_of(i) for i in inputs),
+                                  tuple((p, params[p]) for p in names))
+            return keys[name]
+
+        def value_of(name):
+            if name not in values:
+                func, inputs, names = self.stages[name]
+
+                def compute():
+                    if computed is not None:
+                        computed.add(name)
+                    return func(*[value_of(i) for i in inputs], **{p: params[p] for p in names})
+
+                if name in self.uncached:
+                    values[name] = compute()
+                else:
+                    values[name] = self.cache.get_or_compute(key_of(name), compute)
+            return values[name]
+
+        return {name: value_of(name) for name in targets}
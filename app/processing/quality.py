@@ -0,0 +1,99 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Default acceptance limits per window
+# Kurtosis only rejects sub-Gaussian windows (< 3: mains hum, sinusoidal or flat-topped
+# artefacts); Gaussian noise sits at ~3, so about half of pure-noise windows pass it.
+# Broadband noise is rejected by MAX_HF_RATIO instead. A stricter limit (the usual SQI ~5)
+# would also mask valid low-QRS-peakedness recordings (median ~3.6 on one bundled CSV).
+MIN_KURTOSIS = 3.0
+MAX_FLAT_FRACTION = 0.5  # share of samples with no change (lead off / dropout)
+MAX_SATURATED_FRACTION = 0.05  # share of samples pinned at the record's extremes (ADC clipping)
+MAX_HF_RATIO = 0.4  # power above 40 Hz relative to the 1-40 Hz ECG band (EMG / mains noise)
+
+
+def window_quality(signal, fs, filtered=None, window_sec=2.0, step_sec=1.0, flat_tolerance=1e-6):
+    """
+    Signal-quality metrics for every window, computed in one strided, vectorised pass.
+
+    Args:
+        signal (array): Raw (unfiltered) 1D ECG signal
+        fs (float): Sampling rate (Hz)
+        filtered (array): Band-passed signal for the kurtosis metric (raw if None);
+            baseline wander otherwise hides the QRS peakedness
+        window_sec (float): Window length (s)
+        step_sec (float): Hop between window starts (s); a final window aligned to the
+            end of the record covers the samples after the last full step
+        flat_tolerance (float): Sample-to-sample change treated as "no change"
+
+    Returns:
+        dict: window starts/length (samples) and per-window kurtosis, flat,
+            saturated and hf_ratio arrays
+    """
+    signal = np.asarray(signal, dtype=np.float64)
+    length = int(round(window_sec * fs))
+    step = max(1, int(round(step_sec * fs)))
+    if len(signal) < length:
+        length = len(signal)
+    starts = np.arange(0, len(signal) - length + 1, step)
+    if starts[-1] + length < len(signal):
+        starts = np.append(starts, len(signal) - length)  # last window ends at the record's end
+    windows = sliding_window_view(signal, length)[starts]
+
+    centered = windows - windows.mean(axis=1, keepdims=True)
+    peaked = centered
+    if filtered is not None:
+        peaked = sliding_window_view(np.asarray(filtered, dtype=np.float64), length)[starts]
+        peaked = peaked - peaked.mean(axis=1, keepdims=True)
+    variance = np.mean(peaked ** 2, axis=1)
+    kurtosis = np.mean(peaked ** 4, axis=1) / np.maximum(variance ** 2, 1e-24)
+
+    flat = np.mean(np.abs(np.diff(windows, axis=1)) <= flat_tolerance, axis=1)
+
+    low, high = signal.min(), signal.max()
+    margin = (high - low) * 1e-3
+    saturated = np.mean((windows <= low + margin) | (windows >= high - margin), axis=1)
+
+    spectrum = np.abs(np.fft.rfft(centered, axis=1)) ** 2
+    freqs = np.fft.rfftfreq(length, d=1 / fs)
+    ecg_band = spectrum[:, (freqs >= 1) & (freqs < 40)].sum(axis=1)
+    hf_band = spectrum[:, freqs >= 40].sum(axis=1)
+    hf_ratio = hf_band / np.maximum(ecg_band, 1e-24)
+
+    return {
+        "starts": starts,
+        "length": length,
+        "kurtosis": kurtosis,
+        "flat": flat,
+        "saturated": saturated,
+        "hf_ratio": hf_ratio,
+    }
+
+
+def usable_windows(quality, min_kurtosis=MIN_KURTOSIS, max_flat=MAX_FLAT_FRACTION,
+                   max_saturated=MAX_SATURATED_FRACTION, max_hf_ratio=MAX_HF_RATIO):
+    """Boolean per window: True where every metric is within its limit."""
+    return ((quality["kurtosis"] >= min_kurtosis) & (quality["flat"] <= max_flat) &
+            (quality["saturated"] <= max_saturated) & (quality["hf_ratio"] <= max_hf_ratio))
+
+
+def unusable_mask(quality, usable, n_samples):
+    """
+    Per-sample mask of unusable signal. With overlapping windows a sample is
+    masked only if every window covering it failed.
+    """
+    coverage = np.zeros(n_samples + 1, dtype=np.int64)
+    good = np.zeros(n_samples + 1, dtype=np.int64)
+    ends = np.minimum(quality["starts"] + quality["length"], n_samples)
+    np.add.at(coverage, quality["starts"], 1)
+    np.add.at(coverage, ends, -1)
+    np.add.at(good, quality["starts"][usable], 1)
+    np.add.at(good, ends[usable], -1)
+    covered = np.cumsum(coverage)[:n_samples] > 0
+    return covered & (np.cumsum(good)[:n_samples] == 0)
+
+
+def mask_intervals(mask):
+    """(k, 2) array of [start, stop) sample intervals where mask is True."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.column_stack((np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
@@ -0,0 +1,84 @@
+from fractions import Fraction
+from functools import lru_cache
+
+import numpy as np
+from scipy.signal import firwin, resample_poly
+
+# Sampling rate the arrhythmia CNN was trained on: a 250-sample beat window spans 1 s
+MODEL_SAMPLING_RATE = 250
+
+# Records longer than this (in input samples) are resampled block by block
+RESAMPLE_CHUNK_SIZE = 1 << 20
+
+
+def rational_ratio(fs_in, fs_out, max_denominator=1000):
+    """
+    Approximates fs_out / fs_in by a reduced fraction up / down.
+
+    Args:
+        fs_in (float): Input sampling rate (Hz)
+        fs_out (float): Target sampling rate (Hz)
+        max_denominator (int): Upper bound on the polyphase decimation factor
+
+    Returns:
+        tuple: (up, down) integer factors
+    """
+    ratio = Fraction(fs_out / fs_in).limit_denominator(max_denominator)
+    return ratio.numerator, ratio.denominator
+
+
+@lru_cache(maxsize=32)
+def design_polyphase_filter(up, down):
+    """
+    Anti-aliasing FIR for an up/down polyphase resampler.
+    Same design resample_poly uses internally, computed once per ratio.
+    """
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    taps = firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0))
+    taps.setflags(write=False)
+    return taps
+
+
+def resample_signal(signal, fs_in, fs_out=MODEL_SAMPLING_RATE, chunk_size=None):
+    """
+    Polyphase resampling of a 1D signal, or a (channels, samples) matrix along its last axis.
+
+    Args:
+        signal (array): Input samples
+        fs_in (float): Input sampling rate (Hz)
+        fs_out (float): Target sampling rate (Hz)
+        chunk_size (int): Process long records in blocks of about this many input
+            samples (None resamples the whole record in one call)
+
+    Returns:
+        tuple: (resampled signal, effective output rate)
+    """
+    signal = np.asarray(signal)
+    up, down = rational_ratio(fs_in, fs_out)
+    fs_effective = fs_in * up / down
+    if up == down:
+        return signal, fs_effective
+
+    taps = design_polyphase_filter(up, down)
+    n_in = signal.shape[-1]
+    if chunk_size is None or n_in <= chunk_size:
+        return resample_poly(signal, up, down, axis=-1, window=taps), fs_effective
+
+    # Chunks start on multiples of `down` so that every chunk maps onto a whole
+    # output sample; each one carries enough context to cover the filter support.
+    half_len = (len(taps) - 1) // 2
+    context = -(-(half_len // up + 2) // down) * down
+    step = max(down, chunk_size // down * down)
+
+    pieces = []
+    for start in range(0, n_in, step):
+        stop = min(start + step, n_in)
+        lo = max(start - context, 0)
+        hi = min(stop + context, n_in)
+        block = resample_poly(signal[..., lo:hi], up, down, axis=-1, window=taps)
+
+        first = (start - lo) * up // down
+        count = (stop * up + down - 1) // down - start * up // down
+        pieces.append(block[..., first:first + count])
+    return np.concatenate(pieces, axis=-1), fs_effective
@@ -1,5 +1,4 @@
 import numpy as np
-from biosppy.signals import ecg
 
 
 def get_r_peaks(ecg_signal, sampling_rate=250):
@@ -13,10 +12,37 @@ def get_r_peaks(ecg_signal, sampling_rate=250):
     Returns:
         array: Indices of R-peaks
     """
+    from biosppy.signals import ecg  # deferred: biosppy pulls in matplotlib on import
+
     out = ecg.ecg(signal=ecg_signal, sampling_rate=sampling_rate, show=False)
     return out['rpeaks']
 
 
+def extract_beat_matrix(ecg_signal, r_peaks, window_size=250, normalize=True):
+    """
+    Vectorised beat extraction into a single (n_beats, window_size) matrix.
+
+    Args:
+        ecg_signal (array): Full 1D ECG signal
+        r_peaks (array): Detected R-peak indices
+        window_size (int): Number of samples per beat (centered)
+        normalize (bool): Whether to z-normalize each beat
+
+    Returns:
+        tuple: (beats, kept_peaks) where beats is a float32 matrix and
+            kept_peaks are the R-peaks whose window fits inside the signal
+    """
+    half = window_size // 2
+    r_peaks = np.asarray(r_peaks, dtype=np.int64)
+    kept_peaks = r_peaks[(r_peaks - half >= 0) & (r_peaks + half < len(ecg_signal))]
+
+    offsets = np.arange(-half, half)
+    beats = np.asarray(ecg_signal)[kept_peaks[:, None] + offsets].astype(np.float32)
+    if normalize and len(beats):
+        beats = (beats - beats.mean(axis=1, keepdims=True)) / (beats.std(axis=1, keepdims=True) + 1e-6)
+    return beats, kept_peaks
+
+
 def extract_beats_around_r(ecg_signal, r_peaks, window_size=250, normalize=True):
     """
     Extracts windows of ECG data around R-peaks.
@@ -30,18 +56,11 @@ def extract_beats_around_r(ecg_signal, r_peaks, window_size=250, normalize=True)
     Returns:
         list of arrays: Segmented and optionally normalized beats
     """
-    half = window_size // 2
-    beats = []
-    for r in r_peaks:
-        if r - half >= 0 and r + half < len(ecg_signal):
-            beat = ecg_signal[r - half:r + half].astype(np.float32)
-            if normalize:
-                beat = (beat - np.mean(beat)) / (np.std(beat) + 1e-6)
-            beats.append(beat)
-    return beats
+    beats, _ = extract_beat_matrix(ecg_signal, r_peaks, window_size=window_size, normalize=normalize)
+    return list(beats)
 
 
-def segment_ecg_pipeline(signal, sampling_rate=250, window_size=250):
+def segment_ecg_pipeline(signal, sampling_rate=250, window_size=250, return_peaks=False):
     """
     Full segmentation pipeline: detect peaks + extract clean beats.
 
@@ -49,10 +68,13 @@ def segment_ecg_pipeline(signal, sampling_rate=250, window_size=250):
         signal (array): Raw or filtered ECG signal
         sampling_rate (int): Hz
         window_size (int): Beat window size
+        return_peaks (bool): Also return the R-peak index of every beat
 
     Returns:
-        list of np.array: Processed ECG beats
+        list of np.array: Processed ECG beats (and their R-peaks if return_peaks)
     """
     r_peaks = get_r_peaks(signal, sampling_rate=sampling_rate)
+    if return_peaks:
+        return extract_beat_matrix(signal, r_peaks, window_size=window_size)
     beats = extract_beats_around_r(signal, r_peaks, window_size=window_size)
     return beats
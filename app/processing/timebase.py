@@ -0,0 +1,126 @@
+import numpy as np
+
+
+class Timebase:
+    """
+    Uniform sampling grid described by (t0, fs, n) instead of a stored time array.
+    Every time <-> index conversion is O(1) arithmetic. `gaps` holds the (k, 2)
+    sample [start, stop) ranges that were interpolated over missing data by regrid().
+    """
+
+    def __init__(self, t0, fs, n, gaps=None):
+        self.t0 = float(t0)
+        self.fs = float(fs)
+        self.n = int(n)
+        self.gaps = np.empty((0, 2), dtype=np.int64) if gaps is None else np.asarray(gaps, dtype=np.int64)
+
+    def __len__(self):
+        return self.n
+
+    def __repr__(self):
+        return f"Timebase(t0={self.t0}, fs={self.fs}, n={self.n})"
+
+    @property
+    def end(self):
+        """Time of the last sample."""
+        return self.time_of(self.n - 1) if self.n else self.t0
+
+    def time_of(self, index):
+        """Time (s) of a sample index, or of an array of indices."""
+        return self.t0 + np.asarray(index) / self.fs
+
+    def index_of(self, t):
+        """Nearest sample index of a time, clipped to the record."""
+        index = np.rint((np.asarray(t) - self.t0) * self.fs).astype(np.int64)
+        index = np.clip(index, 0, max(self.n - 1, 0))
+        return index if np.ndim(t) else int(index)
+
+    def slice_between(self, t_start, t_end):
+        """Index slice of the samples with t_start <= t <= t_end."""
+        start = int(np.ceil((t_start - self.t0) * self.fs - 1e-9))
+        stop = int(np.floor((t_end - self.t0) * self.fs + 1e-9)) + 1
+        return slice(min(max(start, 0), self.n), min(max(stop, 0), self.n))
+
+    def times(self, start=0, stop=None):
+        """Materialise the time axis for samples [start, stop) only."""
+        stop = self.n if stop is None else stop
+        return self.t0 + np.arange(start, stop) / self.fs
+
+    def with_rate(self, fs, n):
+        """Same start time, new sampling rate and length (e.g. after resampling); gaps are rescaled."""
+        scale = fs / self.fs
+        gaps = np.column_stack((np.floor(self.gaps[:, 0] * scale), np.ceil(self.gaps[:, 1] * scale)))
+        return Timebase(self.t0, fs, n, gaps=np.clip(gaps, 0, n))
+
+
+def infer_timebase(timestamps, jitter_tolerance=0.01, gap_factor=1.5):
+    """
+    Validates a timestamp column in one vectorised pass.
+
+    Args:
+        timestamps (array): Sample times in seconds
+        jitter_tolerance (float): Max relative deviation of a step from the median step
+        gap_factor (float): Steps longer than this many median steps count as gaps
+
+    Returns:
+        tuple: (Timebase, report) where report flags jitter, gaps and ordering problems
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    if len(timestamps) < 2:
+        raise ValueError("At least two timestamps are needed to infer a sampling rate")
+
+    steps = np.diff(timestamps)
+    dt = np.median(steps[steps > 0]) if np.any(steps > 0) else 0.0
+    if dt <= 0:
+        raise ValueError("Timestamps do not increase")
+
+    deviation = np.abs(steps - dt) / dt
+    report = {
+        "non_monotonic": int(np.count_nonzero(steps <= 0)),
+        "gaps": int(np.count_nonzero(steps > gap_factor * dt)),
+        "max_jitter": float(deviation.max()),
+    }
+    report["uniform"] = (report["non_monotonic"] == 0 and report["gaps"] == 0
+                         and report["max_jitter"] <= jitter_tolerance)
+
+    if report["non_monotonic"] == 0 and report["gaps"] == 0:
+        # Least-squares slope of time vs. index over the whole record: jitter averages out
+        index = np.arange(len(timestamps)) - (len(timestamps) - 1) / 2.0
+        fs = float(np.dot(index, index) / np.dot(index, timestamps - timestamps.mean()))
+    else:
+        fs = 1.0 / dt
+    if abs(fs - round(fs)) < 1e-6 * fs:
+        fs = float(round(fs))
+    return Timebase(timestamps[0], fs, len(timestamps)), report
+
+
+def regrid(timestamps, signal, timebase, gap_factor=1.5):
+    """
+    Linearly interpolates an irregularly sampled signal onto a uniform timebase.
+    Out-of-order and duplicated timestamps are sorted / dropped first.
+
+    Args:
+        timestamps (array): Sample times in seconds
+        signal (array): Samples
+        timebase (Timebase): Grid whose rate is used (see infer_timebase)
+        gap_factor (float): Steps longer than this many grid steps count as gaps
+
+    Returns:
+        tuple: (Timebase covering the record, regridded signal, gaps) where gaps are the
+            (k, 2) sample [start, stop) ranges interpolated across missing data, also
+            kept as the Timebase's `gaps` so they can be masked downstream
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    order = np.argsort(timestamps, kind="stable")
+    timestamps, keep = np.unique(timestamps[order], return_index=True)
+    signal = np.asarray(signal)[order][keep]
+
+    n = int(np.floor((timestamps[-1] - timestamps[0]) * timebase.fs + 1e-9)) + 1
+    # Grid samples strictly between the two timestamps around a gap are made up
+    positions = (timestamps - timestamps[0]) * timebase.fs
+    after = np.flatnonzero(np.diff(positions) > gap_factor)
+    gaps = np.column_stack((np.floor(positions[after] + 1e-9) + 1, np.ceil(positions[after + 1] - 1e-9)))
+    gaps = np.clip(gaps, 0, n).astype(np.int64)
+
+    uniform = Timebase(timestamps[0], timebase.fs, n, gaps=gaps)
+    return uniform, np.interp(uniform.times(), timestamps, signal), gaps
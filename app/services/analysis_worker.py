@@ -0,0 +1,176 @@
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from app.services.shared_arrays import share_arrays, attach_arrays, close_block
+
+# Stages whose arrays are published to shared memory for every result. The worker
+# does not cache them, so each signal exists once (in the block) rather than twice;
+# they are recomputed from the cached raw record when a result is requested again.
+PUBLISHED_STAGES = ("resample", "filter", "metrics")
+LIVENESS_POLL_SEC = 1.0  # how often a silent listener checks that the process is still alive
+
+
+def _worker_main(requests, responses):
+    """
+    Analysis process: runs RecordAnalyzer on requested files and publishes the
+    result arrays into shared memory. Only a descriptor and the small non-array
+    fields (labels, stats, timebase, event indexes) travel through the queue.
+    """
+    from app.processing.analysis import RecordAnalyzer
+    from app.processing.classifier import ECGClassifier
+
+    analyzer = RecordAnalyzer(ECGClassifier.default(), uncached_stages=PUBLISHED_STAGES)
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        request_id, path, params = request
+        try:
+            result = analyzer.analyze_file(path, **params)
+            if result is None:
+                responses.put((request_id, None, None, f"Cannot load {path}"))
+                continue
+            arrays = {name: value for name, value in result.items() if isinstance(value, np.ndarray)}
+            fields = {name: value for name, value in result.items() if name not in arrays}
+            block, descriptor = share_arrays(arrays)
+            responses.put((request_id, descriptor, fields, None))
+            block.close()  # the GUI maps and unlinks the block
+        except Exception as e:
+            responses.put((request_id, None, None, str(e)))
+
+
+class AnalysisWorker(QObject):
+    """
+    GUI-side handle of the analysis process.
+
+    submit() returns immediately; finished(result) is emitted on the GUI thread
+    with the result arrays mapped straight from shared memory (no pickling or
+    copying of signals), so the window stays responsive on large records.
+    Only the latest submission is delivered; superseded results are dropped.
+    analyze() is the blocking variant for background threads (review-queue
+    prefetch), so the GUI process never loads a model or a stage cache itself.
+
+    If the process dies (e.g. killed when out of memory), whatever was waiting on
+    it fails and the next request starts a new one.
+    """
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self._context = multiprocessing.get_context("spawn")  # never fork a running Qt application
+        self._lock = threading.Lock()  # submit() runs on the GUI thread, analyze() on prefetch threads
+        self._start_process()
+
+        self._last_id = 0
+        self._latest_id = 0  # last submit(); 0 once answered
+        self._waiters = {}  # request id -> Future of an analyze() call
+        self._open_blocks = []  # mappings released by the GUI but still referenced by views
+        self._closing = False
+        self._listener = threading.Thread(target=self._listen, name="analysis-listener", daemon=True)
+        self._listener.start()
+
+    def submit(self, path, **params):
+        with self._lock:
+            self._latest_id = self._put(path, params)
+
+    def analyze(self, path, **params):
+        """
+        Analyze a record and wait for the result (never call this on the GUI thread).
+
+        Returns:
+            dict: Result with its arrays in shared memory (give result["shared_block"]
+                back with release()), or None if the record could not be analyzed
+        """
+        future = Future()
+        with self._lock:
+            self._waiters[self._put(path, params)] = future
+        return future.result()
+
+    def release(self, block):
+        """Give back a result's shared block once the GUI has moved on to another result."""
+        self._open_blocks.append(block)
+        self._open_blocks = [b for b in self._open_blocks if not close_block(b)]
+
+    def close(self):
+        self._closing = True
+        self._requests.put(None)
+        self._process.join(timeout=2)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._responses.put(None)
+        self._listener.join(timeout=2)
+        with self._lock:
+            self._abandon_requests()
+        self._open_blocks = [b for b in self._open_blocks if not close_block(b)]
+
+    def _start_process(self):
+        # New queues each time: a process killed mid-put can leave the old ones unusable
+        self._requests = self._context.Queue()
+        self._responses = self._context.Queue()
+        self._process = self._context.Process(target=_worker_main, args=(self._requests, self._responses),
+                                              name="analysis-worker", daemon=True)
+        self._process.start()
+
+    def _put(self, path, params):
+        """Queue a request (lock held) and return its id, first restarting a dead process."""
+        if not self._process.is_alive():
+            print(f"Analysis process exited (code {self._process.exitcode}), restarting it")
+            self._abandon_requests()
+            self._start_process()
+        self._last_id += 1
+        self._requests.put((self._last_id, path, params))
+        return self._last_id
+
+    def _abandon_requests(self):
+        """Fail everything still waiting on the current process (lock held)."""
+        waiters, self._waiters = self._waiters, {}
+        for future in waiters.values():
+            future.set_result(None)
+        if self._latest_id and not self._closing:
+            self.failed.emit(f"Analysis process exited (code {self._process.exitcode})")
+        self._latest_id = 0
+
+    def _listen(self):
+        while True:
+            responses = self._responses
+            try:
+                response = responses.get(timeout=LIVENESS_POLL_SEC)
+            except queue.Empty:
+                with self._lock:
+                    if responses is self._responses and not self._process.is_alive() and not self._closing:
+                        self._abandon_requests()  # nothing will ever answer them
+                continue
+            if response is None:
+                break
+
+            request_id, descriptor, fields, error = response
+            with self._lock:
+                waiter = self._waiters.pop(request_id, None)
+                latest = request_id == self._latest_id
+                if latest:
+                    self._latest_id = 0
+            if error is not None:
+                if waiter is not None:
+                    print(f"Processing error: {error}")
+                    waiter.set_result(None)
+                elif latest:
+                    self.failed.emit(error)
+                continue
+
+            block, views = attach_arrays(descriptor)
+            if waiter is None and not latest:
+                del views
+                close_block(block)  # superseded by a newer submission
+                continue
+            result = dict(fields, **views)
+            result["shared_block"] = block
+            if waiter is not None:
+                waiter.set_result(result)
+            else:
+                self.finished.emit(result)
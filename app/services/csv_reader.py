@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_TIME_COLUMN = "Time"
+DEFAULT_SIGNAL_COLUMN = "ECG"
+
+# Time stays float64: float32 cannot resolve 2 ms steps beyond ~4 h of recording
+TIME_DTYPE = np.float64
+SIGNAL_DTYPE = np.float32
+
+
+def resolve_columns(file_path, time_column=DEFAULT_TIME_COLUMN, signal_column=DEFAULT_SIGNAL_COLUMN):
+    """
+    Pick the time/signal columns by name, falling back to the first two columns
+    (older exports label the signal e.g. "FHR" instead of "ECG"). A fallback never
+    reuses a column already matched by name, e.g. ["ECG2", "Time"] -> ("Time", "ECG2").
+    """
+    header = list(pd.read_csv(file_path, nrows=0).columns)
+    if len(header) < 2:
+        raise ValueError("CSV must have at least 2 columns")
+    time_name = time_column if time_column in header else None
+    signal_name = signal_column if signal_column in header and signal_column != time_name else None
+    remaining = [name for name in header if name not in (time_name, signal_name)]
+    if time_name is None:
+        time_name = remaining.pop(0)
+    if signal_name is None:
+        signal_name = remaining.pop(0)
+    return time_name, signal_name
+
+
+def _read_options(file_path, time_column, signal_column, signal_dtype):
+    time_name, signal_name = resolve_columns(file_path, time_column, signal_column)
+    return {
+        "usecols": [time_name, signal_name],
+        "dtype": {time_name: TIME_DTYPE, signal_name: signal_dtype},
+    }, time_name, signal_name
+
+
+def iter_ecg_csv(file_path, chunk_size=1_000_000, time_column=DEFAULT_TIME_COLUMN,
+                 signal_column=DEFAULT_SIGNAL_COLUMN, signal_dtype=SIGNAL_DTYPE):
+    """
+    Stream an ECG CSV as (times, signal) NumPy blocks of at most chunk_size rows.
+    Only the two selected columns are parsed, straight into their final dtypes.
+    """
+    options, time_name, signal_name = _read_options(file_path, time_column, signal_column, signal_dtype)
+    with pd.read_csv(file_path, engine="c", chunksize=chunk_size, **options) as reader:
+        for block in reader:
+            yield block[time_name].to_numpy(), block[signal_name].to_numpy()
+
+
+def read_ecg_csv(file_path, time_column=DEFAULT_TIME_COLUMN, signal_column=DEFAULT_SIGNAL_COLUMN,
+                 signal_dtype=SIGNAL_DTYPE, engine="c", chunk_size=1_000_000):
+    """
+    Load a whole ECG CSV into (times, signal) arrays.
+
+    Args:
+        file_path (str): CSV file
+        time_column, signal_column (str): Column names (first two columns if absent)
+        signal_dtype: Sample dtype, float32 by default
+        engine (str): "c" parses in chunks to bound peak memory; "pyarrow" parses the
+            file with multiple threads (falls back to "c" when pyarrow is not installed)
+        chunk_size (int): Rows per parsed block for the chunked C engine
+
+    Returns:
+        tuple: (times, signal) NumPy arrays
+    """
+    if engine == "pyarrow":
+        try:
+            import pyarrow  # noqa: F401
+            options, time_name, signal_name = _read_options(file_path, time_column, signal_column, signal_dtype)
+            data = pd.read_csv(file_path, engine="pyarrow", **options)
+            return data[time_name].to_numpy(), data[signal_name].to_numpy()
+        except ImportError:
+            print("pyarrow not installed, using the chunked C parser")
+
+    # Preallocate the final arrays from a fast line count, then fill them block by
+    # block: peak memory is the result plus one parsed chunk.
+    n_rows = count_data_rows(file_path)
+    times = np.empty(n_rows, dtype=TIME_DTYPE)
+    signal = np.empty(n_rows, dtype=signal_dtype)
+    filled = 0
+    for times_block, signal_block in iter_ecg_csv(file_path, chunk_size, time_column, signal_column, signal_dtype):
+        stop = filled + len(times_block)
+        times[filled:stop] = times_block
+        signal[filled:stop] = signal_block
+        filled = stop
+    return times[:filled], signal[:filled]
+
+
+def count_data_rows(file_path, block_size=1 << 24):
+    """Number of lines after the header, counted over raw bytes without parsing."""
+    lines = 0
+    last = b"\n"
+    with open(file_path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1  # final line without trailing newline
+    return max(lines - 1, 0)
@@ -0,0 +1,268 @@
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+DEFAULT_SOCKET_PATH = "/tmp/pulsespy-inference.sock"
+
+# Wire format (little-endian): request  = <II n_beats, beat_length> + float32 beats
+#                              response = <II n_beats, n_classes>   + float32 probabilities
+#                              error    = <II ERROR_FLAG, message_length> + utf-8 message
+HEADER = struct.Struct("<II")
+ERROR_FLAG = 0xFFFFFFFF
+
+
+def _beat_length(model):
+    """Beat length the model accepts, or None if it cannot be read from the model."""
+    shape = getattr(model, "input_shape", None)  # Keras: (None, length, 1)
+    if shape is None and hasattr(model, "interpreter"):  # TFLiteModel
+        shape = model.interpreter.get_input_details()[0]["shape"]
+    if shape is None:
+        n_features = getattr(model, "n_features_in_", None)  # scikit-learn
+        return int(n_features) if n_features else None
+    return int(shape[1]) if len(shape) > 1 and shape[1] else None
+
+
+def _n_classes(model):
+    """Number of output classes of the model, or 0 if it cannot be read from the model."""
+    shape = getattr(model, "output_shape", None)  # Keras: (None, n_classes)
+    if shape is None and hasattr(model, "interpreter"):  # TFLiteModel
+        shape = model.interpreter.get_output_details()[0]["shape"]
+    if shape is None:
+        return len(getattr(model, "classes_", ()))  # scikit-learn
+    return int(shape[-1]) if len(shape) > 1 and shape[-1] else 0
+
+
+def _recv_exact(conn, n_bytes):
+    buffer = bytearray(n_bytes)
+    view = memoryview(buffer)
+    received = 0
+    while received < n_bytes:
+        chunk = conn.recv_into(view[received:])
+        if chunk == 0:
+            raise ConnectionError("connection closed")
+        received += chunk
+    return buffer
+
+
+class InferenceServer:
+    """
+    Hosts one model for every PulseSpy instance on the host.
+
+    Each client connection is served by its own thread, which validates the
+    beats it receives and queues them in chunks of at most `max_batch`; a single
+    batcher thread merges queued chunks into one micro-batch of at most
+    `max_batch` beats, waiting no longer than `max_latency_ms` for the oldest,
+    runs the model once and hands every client its rows.
+    """
+
+    def __init__(self, model_path, socket_path=DEFAULT_SOCKET_PATH, model_type="keras",
+                 max_batch=256, max_latency_ms=5.0):
+        """
+        Args:
+            model_path (str): Model served (see ModelLoader)
+            socket_path (str): Unix socket the server listens on
+            model_type (str): ModelLoader type of the hosted model
+            max_batch (int): Beats per micro-batch before it is run early
+            max_latency_ms (float): Longest a request waits for others to join its batch
+        """
+        from app.processing.model_loader import ModelLoader
+
+        self.model = ModelLoader(model_path, model_type).get_model()
+        self.beat_length = _beat_length(self.model)
+        self.n_classes = _n_classes(self.model)
+        self.socket_path = socket_path
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms / 1000.0
+        self.stats = {"requests": 0, "beats": 0, "batches": 0}
+
+        self._requests = queue.Queue()  # (beats, Future), at most max_batch beats each
+        self._running = threading.Event()
+        self._carry = None  # chunk that did not fit into the previous batch
+        self._socket = None
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.bind(self.socket_path)
+        self._socket.listen()
+        self._running.set()
+        threading.Thread(target=self._batch_loop, name="inference-batcher", daemon=True).start()
+
+        try:
+            while self._running.is_set():
+                try:
+                    conn, _ = self._socket.accept()
+                except OSError:
+                    break  # socket closed by shutdown()
+                threading.Thread(target=self._serve_client, args=(conn,), daemon=True).start()
+        finally:
+            self.shutdown()
+
+    def start(self):
+        """Serve from a background thread; returns once the socket accepts connections."""
+        threading.Thread(target=self.serve_forever, name="inference-server", daemon=True).start()
+        self._running.wait()
+        return self
+
+    def shutdown(self):
+        self._running.clear()
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        self._requests.put(None)  # wake the batcher so it can exit
+
+        # Requests still queued will never be run: fail them instead of leaving clients waiting
+        pending = [self._carry] if self._carry is not None else []
+        self._carry = None
+        while True:
+            try:
+                pending.append(self._requests.get_nowait())
+            except queue.Empty:
+                break
+        for item in pending:
+            if item is not None:
+                item[1].set_exception(ConnectionError("Inference server shut down"))
+
+    def _serve_client(self, conn):
+        with conn:
+            try:
+                while True:
+                    n_beats, length = HEADER.unpack(_recv_exact(conn, HEADER.size))
+                    beats = np.frombuffer(_recv_exact(conn, n_beats * length * 4), dtype="<f4")
+                    try:
+                        probabilities = self._predict(beats.reshape(n_beats, length))
+                        conn.sendall(HEADER.pack(*probabilities.shape) + probabilities.tobytes())
+                    except Exception as e:
+                        message = str(e).encode()
+                        conn.sendall(HEADER.pack(ERROR_FLAG, len(message)) + message)
+            except (ConnectionError, OSError):
+                pass  # client went away
+
+    def _predict(self, beats):
+        """Queue one client request in max_batch chunks and gather its probabilities."""
+        if len(beats) == 0:
+            return np.zeros((0, self.n_classes), dtype="<f4")  # nothing to batch
+        if self.beat_length is not None and beats.shape[1] != self.beat_length:
+            raise ValueError(f"beats must be {self.beat_length} samples long, got {beats.shape[1]}")
+        if not self._running.is_set():
+            raise ConnectionError("Inference server shut down")
+        futures = []
+        for start in range(0, len(beats), self.max_batch):
+            future = Future()
+            self._requests.put((beats[start:start + self.max_batch], future))
+            futures.append(future)
+        results = [future.result() for future in futures]
+        return np.ascontiguousarray(np.concatenate(results) if len(results) > 1 else results[0], dtype="<f4")
+
+    def _batch_loop(self):
+        while self._running.is_set():
+            first, self._carry = self._carry, None
+            if first is None:
+                first = self._requests.get()
+            if first is None:
+                break
+            pending = [first]
+            n_beats = len(first[0])
+            deadline = time.monotonic() + self.max_latency
+
+            # Let other clients' requests join until the batch is full or the oldest is due
+            while n_beats < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._running.clear()
+                    break
+                if n_beats + len(item[0]) > self.max_batch:
+                    self._carry = item  # starts the next batch
+                    break
+                pending.append(item)
+                n_beats += len(item[0])
+
+            self._run_batch(pending)
+
+    def _run_batch(self, pending):
+        # Requests of different beat lengths (only possible when the model's input
+        # length is unknown) run as separate batches, so one cannot fail the others
+        groups = {}
+        for item in pending:
+            groups.setdefault(item[0].shape[1], []).append(item)
+        for group in groups.values():
+            self._run_group(group)
+
+    def _run_group(self, pending):
+        batches = [beats for beats, _ in pending]
+        try:
+            batch = np.concatenate(batches)[..., np.newaxis]  # CNN style
+            if hasattr(self.model, "predict_on_batch"):
+                # Keras predict() costs ~100 ms of setup per call; one bounded batch needs none of it
+                probabilities = np.asarray(self.model.predict_on_batch(batch))
+            else:
+                probabilities = self.model.predict(batch, verbose=0)
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        self.stats["requests"] += len(pending)
+        self.stats["beats"] += len(batch)
+        self.stats["batches"] += 1
+        offsets = np.cumsum([0] + [len(beats) for beats in batches])
+        for (_, future), start, stop in zip(pending, offsets[:-1], offsets[1:]):
+            future.set_result(probabilities[start:stop])
+
+
+class RemoteModel:
+    """
+    Client of an InferenceServer behind the Keras-style predict(batch) used by
+    ECGClassifier. Each thread keeps its own connection, so concurrent callers
+    (GUI plus review-queue prefetch) batch together on the server.
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH):
+        self.socket_path = socket_path
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.connect(self.socket_path)
+            self._local.conn = conn
+        return conn
+
+    def predict(self, batch, verbose=0):
+        beats = np.asarray(batch, dtype="<f4")
+        # Flatten by the trailing shape, not -1, which cannot be inferred for an empty batch
+        beats = np.ascontiguousarray(beats.reshape(len(beats), int(np.prod(beats.shape[1:]))))
+        conn = self._connection()
+        try:
+            conn.sendall(HEADER.pack(*beats.shape) + beats.tobytes())
+            n_beats, n_classes = HEADER.unpack(_recv_exact(conn, HEADER.size))
+        except (ConnectionError, OSError):
+            conn.close()
+            self._local.conn = None
+            raise
+        if n_beats == ERROR_FLAG:
+            raise RuntimeError(f"Inference server error: {_recv_exact(conn, n_classes).decode()}")
+        payload = _recv_exact(conn, n_beats * n_classes * 4)
+        return np.frombuffer(payload, dtype="<f4").reshape(n_beats, n_classes)
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
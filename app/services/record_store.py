@@ -0,0 +1,166 @@
+import json
+import struct
+import zlib
+
+import numpy as np
+
+from app.processing.timebase import Timebase
+
+# Layout of a .pss record file:
+#   MAGIC | compressed chunk 0 | chunk 1 | ... | annotations | JSON footer | footer length (uint64)
+# The footer holds the metadata and the chunk index (byte offset, byte length, first sample),
+# so a reader can seek straight to the chunks covering any sample range.
+MAGIC = b"PSPYREC1"
+RECORD_EXTENSION = ".pss"
+_FOOTER_SIZE = struct.Struct("<Q")
+
+
+def _adc_scale(signal):
+    """
+    Gain/baseline mapping the signal's range onto the full int16 span (physical = (adc - baseline) / gain).
+
+    The full min-max range is used so no sample is ever clipped; the price is that a
+    single large outlier (e.g. an artefact spike) coarsens the resolution of the whole
+    record. Pass gain/baseline to save_record() to trade that the other way.
+    """
+    if signal.size == 0:
+        return 1.0, 0.0
+    low, high = float(np.min(signal)), float(np.max(signal))
+    half_range = (high - low) / 2 or 1.0
+    gain = 32767 / half_range
+    baseline = -(high + low) / 2 * gain
+    return gain, baseline
+
+
+def save_record(path, signal, fs, t0=0.0, annotation_times=None, dtype="int16",
+                gain=None, baseline=None, chunk_size=65536, level=6):
+    """
+    Write a signal to the compact chunked record format.
+
+    Args:
+        path (str): Output file (.pss)
+        signal (array): 1D physical signal (e.g. mV)
+        fs (float): Sampling rate (Hz)
+        t0 (float): Time of the first sample (s)
+        annotation_times (array): Optional reference annotation times (s)
+        dtype (str): "int16" ADC counts with gain/baseline, or "float32"
+        gain, baseline (float): ADC scaling; derived from the signal range if omitted
+        chunk_size (int): Samples per independently compressed chunk
+        level (int): zlib compression level
+
+    Returns:
+        int: Size of the written file in bytes
+    """
+    signal = np.asarray(signal)
+    if dtype == "int16":
+        if gain is None or baseline is None:
+            gain, baseline = _adc_scale(signal)
+        samples = np.clip(np.rint(signal * gain + baseline), -32768, 32767).astype("<i2")
+    elif dtype == "float32":
+        gain, baseline = 1.0, 0.0
+        samples = signal.astype("<f4")
+    else:
+        raise ValueError(f"Unsupported storage dtype: {dtype}")
+
+    chunks = []
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        for start in range(0, len(samples), chunk_size):
+            # Delta coding makes the slowly varying int16 counts far more compressible
+            block = samples[start:start + chunk_size]
+            payload = np.diff(block, prepend=np.zeros(1, block.dtype)) if dtype == "int16" else block
+            data = zlib.compress(payload.tobytes(), level)
+            chunks.append([f.tell(), len(data), start])
+            f.write(data)
+
+        annotations = None
+        if annotation_times is not None:
+            data = zlib.compress(np.asarray(annotation_times, dtype="<f8").tobytes(), level)
+            annotations = [f.tell(), len(data)]
+            f.write(data)
+
+        footer = json.dumps({
+            "fs": float(fs),
+            "t0": float(t0),
+            "n": int(len(samples)),
+            "dtype": dtype,
+            "gain": float(gain),
+            "baseline": float(baseline),
+            "chunk_size": int(chunk_size),
+            "chunks": chunks,
+            "annotations": annotations,
+        }).encode("utf-8")
+        f.write(footer)
+        f.write(_FOOTER_SIZE.pack(len(footer)))
+        return f.tell()
+
+
+class RecordReader:
+    """Random-access reader for .pss records: only chunks overlapping a request are decoded."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        if self._file.read(len(MAGIC)) != MAGIC:
+            self._file.close()
+            raise ValueError(f"Not a PulseSpy record file: {path}")
+
+        self._file.seek(-_FOOTER_SIZE.size, 2)
+        (footer_len,) = _FOOTER_SIZE.unpack(self._file.read(_FOOTER_SIZE.size))
+        self._file.seek(-_FOOTER_SIZE.size - footer_len, 2)
+        self.meta = json.loads(self._file.read(footer_len).decode("utf-8"))
+
+        self.timebase = Timebase(self.meta["t0"], self.meta["fs"], self.meta["n"])
+        self._storage_dtype = np.dtype("<i2" if self.meta["dtype"] == "int16" else "<f4")
+        self._cached_chunk = (None, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.meta["n"]
+
+    def close(self):
+        self._file.close()
+
+    def _decode_chunk(self, i):
+        if self._cached_chunk[0] == i:
+            return self._cached_chunk[1]
+
+        offset, length, _ = self.meta["chunks"][i]
+        self._file.seek(offset)
+        block = np.frombuffer(zlib.decompress(self._file.read(length)), dtype=self._storage_dtype)
+        if self.meta["dtype"] == "int16":
+            block = np.cumsum(block, dtype=np.int16)
+        self._cached_chunk = (i, block)
+        return block
+
+    def read(self, start=0, stop=None):
+        """Physical samples [start, stop) as float32, decoding only the chunks involved."""
+        n, chunk_size = self.meta["n"], self.meta["chunk_size"]
+        stop = n if stop is None else min(stop, n)
+        start = max(start, 0)
+        if stop <= start:
+            return np.empty(0, dtype=np.float32)
+
+        first, last = start // chunk_size, (stop - 1) // chunk_size
+        raw = np.concatenate([self._decode_chunk(i) for i in range(first, last + 1)])
+        raw = raw[start - first * chunk_size:stop - first * chunk_size]
+        if self.meta["dtype"] == "int16":
+            return ((raw - np.float32(self.meta["baseline"])) / np.float32(self.meta["gain"])).astype(np.float32)
+        return raw.astype(np.float32)
+
+    def read_time(self, t_start, t_end):
+        """Samples with t_start <= t <= t_end."""
+        window = self.timebase.slice_between(t_start, t_end)
+        return self.read(window.start, window.stop)
+
+    def annotation_times(self):
+        if self.meta["annotations"] is None:
+            return None
+        offset, length = self.meta["annotations"]
+        self._file.seek(offset)
+        return np.frombuffer(zlib.decompress(self._file.read(length)), dtype="<f8").copy()
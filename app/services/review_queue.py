@@ -0,0 +1,184 @@
+import glob
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+REVIEW_PATTERNS = ("*.csv", "*.hea", "*.pss")
+
+
+def result_nbytes(result):
+    """Memory held by the arrays of an analysis result."""
+    return sum(value.nbytes for value in result.values() if isinstance(value, np.ndarray))
+
+
+class ReviewQueue:
+    """
+    Ordered list of records reviewed one after another.
+
+    The next `prefetch` records are loaded and fully analyzed in a background
+    thread pool while the current one is on screen; finished results are kept
+    in an LRU bounded by both a record count and a memory budget. The look-ahead
+    shrinks when results of the typical size seen so far would not fit the
+    budget next to the current record, so no prefetch is computed only to be evicted.
+    load_current() waits for the current record on a loader thread, so a GUI never blocks on it.
+    """
+
+    def __init__(self, files, analyze, prefetch=2, workers=2, cache_size=8, memory_budget_mb=512,
+                 release=None):
+        """
+        Args:
+            files (list): Record paths in review order
+            analyze (callable): path -> analysis result dict (or None if unreadable)
+            prefetch (int): How many records ahead to prepare
+            workers (int): Background analysis threads
+            cache_size (int): Max finished results kept
+            memory_budget_mb (float): Max array memory held by finished results
+            release (callable): Called with every result the queue drops (e.g. to free shared memory)
+        """
+        self.files = list(files)
+        self.analyze = analyze
+        self.prefetch = prefetch
+        self.cache_size = cache_size
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.release = release
+        self.position = 0
+        self._closed = False
+
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="review-prefetch")
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="review-loader")
+        self._pending = {}  # path -> Future
+        self._results = OrderedDict()  # path -> result, least recently used first
+        self._lock = threading.RLock()  # prefetch completions arrive on worker threads
+
+    @classmethod
+    def from_directory(cls, directory, analyze, **kwargs):
+        """Queue every CSV / WFDB / .pss record in a directory, sorted by name."""
+        files = []
+        for pattern in REVIEW_PATTERNS:
+            files.extend(glob.glob(os.path.join(directory, pattern)))
+        return cls(sorted(files), analyze, **kwargs)
+
+    def __len__(self):
+        return len(self.files)
+
+    @property
+    def current_path(self):
+        return self.files[self.position] if self.files else None
+
+    def current(self):
+        """Result for the current record, waiting for it only if it is not ready yet."""
+        if not self.files:
+            return None
+        return self.result(self.current_path)
+
+    def result(self, path):
+        """Result for one queued record; also tops up the prefetch around the current position."""
+        result = self._take(path)
+        self._schedule_prefetch()
+        return result
+
+    def load_current(self):
+        """
+        Non-blocking current(): a Future of (path, result), resolved on the loader
+        thread. The path tells a caller whether the queue has moved on meanwhile.
+        """
+        path = self.current_path
+        return self._loader.submit(lambda: (path, self.result(path) if path is not None else None))
+
+    def step(self, offset):
+        """Move through the queue (clamped to its ends) without waiting for the record."""
+        self.position = min(max(self.position + offset, 0), max(len(self.files) - 1, 0))
+        return self.current_path
+
+    def next(self):
+        self.step(1)
+        return self.current()
+
+    def previous(self):
+        self.step(-1)
+        return self.current()
+
+    def close(self):
+        self._closed = True
+        for future in self._pending.values():
+            future.cancel()
+        self._pool.shutdown(wait=False)
+        self._loader.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            results, self._results = list(self._results.values()), OrderedDict()
+        for result in results:
+            self._drop(result)
+
+    def _take(self, path):
+        with self._lock:
+            if path in self._results:
+                self._results.move_to_end(path)
+                return self._results[path]
+            future = self._pending.pop(path, None)
+
+        result = future.result() if future is not None else self.analyze(path)
+        if result is not None and not self._closed:
+            with self._lock:
+                self._results[path] = result
+                self._evict()
+        return result
+
+    def _lookahead(self):
+        """Records to prefetch: up to `prefetch` ahead, as many as the memory budget has room for."""
+        depth = min(self.prefetch, self.cache_size - 1)
+        sizes = [result_nbytes(r) for r in self._results.values()]
+        if sizes:
+            estimate = max(float(np.mean(sizes)), 1.0)
+            current = self._results.get(self.current_path)
+            free = self.memory_budget - (result_nbytes(current) if current is not None else estimate)
+            depth = min(depth, max(int(free // estimate), 0))
+        return self.files[self.position + 1:self.position + 1 + depth]
+
+    def _schedule_prefetch(self):
+        with self._lock:
+            upcoming = self._lookahead()
+            for path in upcoming:
+                if path not in self._results and path not in self._pending:
+                    future = self._pool.submit(self.analyze, path)
+                    self._pending[path] = future
+                    future.add_done_callback(lambda f, p=path: self._store(p, f))
+
+            # Drop work for records that fell out of the look-ahead window
+            for path in list(self._pending):
+                if path not in upcoming and self._pending[path].cancel():
+                    del self._pending[path]
+
+    def _store(self, path, future):
+        """Background completion: move a finished prefetch into the LRU."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._lock:
+            if self._closed and future.result() is not None:
+                self._drop(future.result())
+                return
+            if self._pending.get(path) is not future:
+                return  # already claimed by _take
+            del self._pending[path]
+            if future.result() is not None:
+                self._results[path] = future.result()
+                self._evict()
+
+    def _evict(self):
+        """Trim the LRU: reviewed records go first, then look-ahead from the furthest; never the current one."""
+        upcoming = self._lookahead()
+        protected = set(upcoming) | {self.current_path}
+        candidates = [path for path in self._results if path not in protected]
+        candidates += [path for path in reversed(upcoming) if path in self._results]
+
+        for path in candidates:
+            total = sum(result_nbytes(r) for r in self._results.values())
+            if len(self._results) <= self.cache_size and total <= self.memory_budget:
+                break
+            self._drop(self._results.pop(path))
+
+    def _drop(self, result):
+        if self.release is not None:
+            self.release(result)
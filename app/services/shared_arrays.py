@@ -0,0 +1,59 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+ALIGNMENT = 64  # every array starts on a cache-line boundary inside the block
+
+
+def share_arrays(arrays):
+    """
+    Copies a dict of arrays into one new shared-memory block.
+
+    Args:
+        arrays (dict): name -> ndarray
+
+    Returns:
+        tuple: (SharedMemory, descriptor) where the descriptor is a small picklable
+            dict {"block": name, "arrays": {name: (dtype, shape, offset)}} that
+            attach_arrays() turns back into views
+    """
+    layout = {}
+    size = 0
+    for name, array in arrays.items():
+        layout[name] = (array.dtype.str, array.shape, size)
+        size += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for name, array in arrays.items():
+        dtype, shape, offset = layout[name]
+        np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)[...] = array
+    return block, {"block": block.name, "arrays": layout}
+
+
+def attach_arrays(descriptor):
+    """
+    Maps a block published by share_arrays() as read-only NumPy views (no copy).
+    The block's name is unlinked right away, so its memory is returned to the
+    system as soon as the last mapping is closed, even if a process crashes.
+
+    Returns:
+        tuple: (SharedMemory, dict of name -> view); close the SharedMemory once
+            the views are no longer used
+    """
+    block = shared_memory.SharedMemory(name=descriptor["block"])
+    block.unlink()
+    views = {}
+    for name, (dtype, shape, offset) in descriptor["arrays"].items():
+        view = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+        view.flags.writeable = False
+        views[name] = view
+    return block, views
+
+
+def close_block(block):
+    """Close a mapping; False if views of it are still alive (retry later)."""
+    try:
+        block.close()
+        return True
+    except BufferError:
+        return False
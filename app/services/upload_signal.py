@@ -1,10 +1,11 @@
 import os
 
 import numpy as np
-import pandas as pd
-import wfdb
 from PyQt5.QtWidgets import QFileDialog
 
+from app.processing.timebase import Timebase, infer_timebase, regrid
+from app.services.record_store import RecordReader, RECORD_EXTENSION
+
 
 class SignalFileUploader:
     last_opened_folder = "static/datasets"
@@ -18,7 +19,7 @@ class SignalFileUploader:
                 parent=None,
                 caption="Select Signal File",
                 directory=cls.last_opened_folder,
-                filter="CSV Files (*.csv);;WFDB Files (*.dat *.hea *.atr);;All Files (*)",
+                filter="CSV Files (*.csv);;WFDB Files (*.dat *.hea *.atr);;PulseSpy Records (*.pss);;All Files (*)",
                 options=options
             )
             if file_path:
@@ -28,6 +29,15 @@ class SignalFileUploader:
         except Exception as e:
             raise Exception(f"File upload error: {str(e)}")
 
+    @classmethod
+    def select_review_directory(cls):
+        """Open a folder dialog to pick a directory of records for the review queue."""
+        directory = QFileDialog.getExistingDirectory(None, "Select Records Folder", cls.last_opened_folder)
+        if directory:
+            cls.last_opened_folder = directory
+            return directory
+        return None
+
     @staticmethod
     def load_signal_data(file_path):
         """Load signal data from CSV or WFDB files."""
@@ -41,6 +51,9 @@ class SignalFileUploader:
             elif file_ext in [".dat", ".hea", ".atr"]:
                 record_name = os.path.splitext(file_path)[0]
                 return SignalFileUploader.load_wfdb_data(record_name)
+            elif file_ext == RECORD_EXTENSION:
+                timebase, signal, annotation_times = SignalFileUploader.load_stored_record(file_path)
+                return timebase.times(), signal, annotation_times
             print("Unsupported file format.")
             return None, None, None
         except Exception as e:
@@ -51,30 +64,125 @@ class SignalFileUploader:
     def load_csv_data(filepath):
         """Load ECG data from CSV."""
         try:
-            data = pd.read_csv(filepath)
-            if data.shape[1] < 2:
-                raise ValueError("CSV must have at least 2 columns")
-
-            x_data = data.iloc[:, 0].values  # Use numpy array instead of list
-            y_data = data.iloc[:, 1].values
+            # Chunked, dtype-controlled parse of the Time / ECG columns only (pandas loads on first CSV)
+            from app.services.csv_reader import read_ecg_csv
+            x_data, y_data = read_ecg_csv(filepath)
             return x_data, y_data, None
         except Exception as e:
             print(f"CSV load error: {e}")
             return None, None, None
 
+    @staticmethod
+    def load_timed_signal(file_path):
+        """
+        Load a signal together with a validated uniform Timebase instead of a time array.
+        Non-uniform CSV timestamps (jitter, gaps, disorder) are reported and regridded.
+        """
+        if not file_path:
+            return None, None, None
+
+        try:
+            file_ext = os.path.splitext(file_path)[1].lower()
+            if file_ext in [".dat", ".hea", ".atr"]:
+                fs, signal, arrhythmia_times = SignalFileUploader.read_wfdb_record(os.path.splitext(file_path)[0])
+                return Timebase(0.0, fs, len(signal)), signal, arrhythmia_times
+            if file_ext == RECORD_EXTENSION:
+                return SignalFileUploader.load_stored_record(file_path)
+
+            x_data, y_data, annotations = SignalFileUploader.load_signal_data(file_path)
+            if x_data is None or y_data is None:
+                return None, None, None
+
+            timebase, report = infer_timebase(x_data)
+            if not report["uniform"]:
+                print(f"Non-uniform timestamps ({report['gaps']} gaps, {report['non_monotonic']} out of order, "
+                      f"max jitter {report['max_jitter']:.1%}); regridding at {timebase.fs:g} Hz")
+                timebase, y_data, _ = regrid(x_data, y_data, timebase)  # gaps travel on the timebase
+            return timebase, y_data, annotations
+        except Exception as e:
+            print(f"Error loading signal: {e}")
+            return None, None, None
+
+    @staticmethod
+    def load_stored_record(file_path):
+        """Load a compact .pss record: (Timebase, float32 signal, annotation times)."""
+        with RecordReader(file_path) as reader:
+            return reader.timebase, reader.read(), reader.annotation_times()
+
+    @staticmethod
+    def read_wfdb_record(record_name):
+        """Read channel 0 of a WFDB record: (fs, signal, annotation times in s)."""
+        import wfdb  # deferred: only needed once a WFDB record is opened
+
+        record = wfdb.rdrecord(record_name)
+        annotation = wfdb.rdann(record_name, "atr")
+
+        fs = record.fs
+        signal = record.p_signal[:, 0]
+        arrhythmia_times = annotation.sample / fs
+        return fs, signal, arrhythmia_times
+
+    @staticmethod
+    def read_wfdb_leads(record_name):
+        """Read every channel of a WFDB record: (fs, (channels, samples) matrix, lead names)."""
+        import wfdb
+
+        record = wfdb.rdrecord(record_name)
+        return record.fs, np.ascontiguousarray(record.p_signal.T), list(record.sig_name)
+
+    @staticmethod
+    def load_leads(file_path):
+        """All leads of a multi-lead WFDB record as (fs, (channels, samples) matrix); None otherwise."""
+        if os.path.splitext(file_path)[1].lower() not in [".dat", ".hea", ".atr"]:
+            return None
+        try:
+            fs, leads, _ = SignalFileUploader.read_wfdb_leads(os.path.splitext(file_path)[0])
+            return (fs, leads) if leads.shape[0] > 1 else None
+        except Exception as e:
+            print(f"WFDB load error: {e}")
+            return None
+
     @staticmethod
     def load_wfdb_data(record_name):
         """Load WFDB record."""
         try:
-            record = wfdb.rdrecord(record_name)
-            annotation = wfdb.rdann(record_name, "atr")
-
-            fs = record.fs
-            signal = record.p_signal[:, 0]
+            fs, signal, arrhythmia_times = SignalFileUploader.read_wfdb_record(record_name)
             time = np.arange(len(signal)) / fs
-            arrhythmia_times = annotation.sample / fs
 
             return time, signal, arrhythmia_times  # Return numpy arrays
         except Exception as e:
             print(f"WFDB load error: {e}")
             return None, None, None
+
+    @staticmethod
+    def load_wfdb_annotations(record_name, extension="atr"):
+        """Load reference beat annotations (sample indices and symbols) of a WFDB record."""
+        try:
+            import wfdb
+            annotation = wfdb.rdann(record_name, extension)
+            return annotation.sample, np.asarray(annotation.symbol)
+        except Exception as e:
+            print(f"WFDB annotation load error: {e}")
+            return None, None
+
+    @staticmethod
+    def load_annotation_events(file_path):
+        """
+        Reference annotations of a WFDB record as (times in s, labels); rhythm-change
+        annotations ('+') are labelled by their aux note, e.g. 'AFIB'. (None, None) otherwise.
+        """
+        if os.path.splitext(file_path)[1].lower() not in [".dat", ".hea", ".atr"]:
+            return None, None
+        try:
+            import wfdb
+            record_name = os.path.splitext(file_path)[0]
+            annotation = wfdb.rdann(record_name, "atr")
+            fs = annotation.fs or wfdb.rdheader(record_name).fs
+
+            labels = np.asarray(annotation.symbol, dtype=object)
+            rhythm = labels == "+"
+            labels[rhythm] = [note.strip("(\x00 ") for note in np.asarray(annotation.aux_note, dtype=object)[rhythm]]
+            return annotation.sample / fs, labels
+        except Exception as e:
+            print(f"WFDB annotation load error: {e}")
+            return None, None
@@ -0,0 +1,55 @@
+# benchmark_clustering.py
+# Usage: python -m app.utils.benchmark_clustering [wfdb_dir] [--model models/arrhythmia_model.h5]
+# Compares per-beat CNN inference with template (cluster) classification on the bundled SVDB records.
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from app.processing.classifier import ECGClassifier
+from app.processing.clustering import classify_clustered
+from app.processing.evaluation import find_records
+from app.processing.filtering import bandpass_filter
+from app.processing.resampling import resample_signal
+from app.processing.segmentation import get_r_peaks, extract_beat_matrix
+from app.services.upload_signal import SignalFileUploader
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-beat vs. clustered classification benchmark.")
+    parser.add_argument("directory", nargs="?",
+                        default="static/datasets/mit-bih-supraventricular-arrhythmia-database-1.0.0")
+    parser.add_argument("--model", default="models/arrhythmia_model.h5")
+    parser.add_argument("--threshold", type=float, default=0.95, help="Template correlation threshold")
+    args = parser.parse_args()
+
+    classifier = ECGClassifier(args.model)
+
+    print(f"{'record':>8} {'beats':>7} {'clusters':>9} {'inferred':>9} "
+          f"{'per-beat s':>11} {'clustered s':>12} {'speed-up':>9} {'agreement':>10}")
+    for record_name in find_records(args.directory):
+        fs, signal, _ = SignalFileUploader.read_wfdb_record(record_name)
+        signal, fs = resample_signal(signal, fs)
+        filtered = bandpass_filter(signal, fs=fs)
+        beats, _ = extract_beat_matrix(filtered, get_r_peaks(filtered, sampling_rate=fs))
+        if len(beats) == 0:
+            continue
+
+        start = time.perf_counter()
+        reference = classifier.predict_batch(beats)
+        per_beat = time.perf_counter() - start
+
+        start = time.perf_counter()
+        labels, info = classify_clustered(classifier, beats, threshold=args.threshold)
+        clustered = time.perf_counter() - start
+
+        agreement = np.mean(np.asarray(labels) == np.asarray(reference))
+        print(f"{os.path.basename(record_name):>8} {info['n_beats']:>7} {info['n_clusters']:>9} "
+              f"{info['n_inferred']:>9} {per_beat:>11.3f} {clustered:>12.3f} {per_beat / clustered:>8.1f}x "
+              f"{agreement:>10.2%}")
+
+
+if __name__ == "__main__":
+    main()
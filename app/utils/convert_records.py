@@ -0,0 +1,35 @@
+# convert_records.py
+# Usage: python -m app.utils.convert_records <csv/wfdb files...> [--dtype int16|float32] [--out-dir DIR]
+
+import argparse
+import os
+
+from app.services.record_store import save_record, RECORD_EXTENSION
+from app.services.upload_signal import SignalFileUploader
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert CSV/WFDB recordings to the compact .pss format.")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--dtype", choices=["int16", "float32"], default="int16")
+    parser.add_argument("--chunk-size", type=int, default=65536, help="Samples per compressed chunk")
+    parser.add_argument("--out-dir", default=None, help="Defaults to each input's own folder")
+    args = parser.parse_args()
+
+    for file_path in args.files:
+        timebase, signal, annotation_times = SignalFileUploader.load_timed_signal(file_path)
+        if signal is None:
+            continue
+
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        out_dir = args.out_dir or os.path.dirname(file_path)
+        out_path = os.path.join(out_dir, stem + RECORD_EXTENSION)
+        size = save_record(out_path, signal, timebase.fs, timebase.t0, annotation_times,
+                           dtype=args.dtype, chunk_size=args.chunk_size)
+
+        in_memory = signal.size * 8  # float64 as loaded
+        print(f"{file_path} -> {out_path}: {size / 1024:.1f} KiB ({in_memory / size:.1f}x smaller than float64)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# evaluate_records.py
+# Usage: python -m app.utils.evaluate_records [wfdb_dir] [--model models/arrhythmia_model.h5] [--multilead]
+
+import argparse
+
+from app.processing.evaluation import evaluate_directory, CONFUSION_LABELS
+
+
+def print_confusion(confusion):
+    print(f"{'ref/pred':>12}" + "".join(f"{label:>9}" for label in CONFUSION_LABELS))
+    for label, row in zip(CONFUSION_LABELS, confusion):
+        print(f"{label:>12}" + "".join(f"{count:>9}" for count in row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate detection/classification against WFDB annotations.")
+    parser.add_argument("directory", nargs="?",
+                        default="static/datasets/mit-bih-supraventricular-arrhythmia-database-1.0.0")
+    parser.add_argument("--model", default=None, help="Keras model path (detection only if omitted)")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Beat matching tolerance in seconds")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--multilead", action="store_true", help="Fused R-peak detection over all leads")
+    args = parser.parse_args()
+
+    results, summary = evaluate_directory(args.directory, args.model, args.tolerance, args.workers,
+                                          args.multilead)
+
+    print(f"{'record':>8} {'ref':>7} {'det':>7} {'Se':>7} {'PPV':>7} {'samples/s':>12}")
+    for r in results:
+        print(f"{r['record']:>8} {r['n_reference']:>7} {r['n_detected']:>7} "
+              f"{r['sensitivity']:>7.2%} {r['ppv']:>7.2%} {r['samples_per_sec']:>12.0f}")
+    print(f"{'total':>8} {summary['n_reference']:>7} {summary['n_detected']:>7} "
+          f"{summary['sensitivity']:>7.2%} {summary['ppv']:>7.2%} {summary['samples_per_sec']:>12.0f}")
+
+    if summary["confusion"] is not None:
+        print()
+        print_confusion(summary["confusion"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# export_beats.py
+# Usage: python -m app.utils.export_beats [wfdb_dir] [--out static/datasets/beats] [--workers 8]
+# The default output directory is git-ignored; exports run to hundreds of MB.
+
+import argparse
+import time
+
+from app.processing.dataset import export_beat_dataset
+from app.processing.evaluation import find_records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export labelled beats of WFDB records as memory-mapped .npy arrays.")
+    parser.add_argument("directory", nargs="?",
+                        default="static/datasets/mit-bih-supraventricular-arrhythmia-database-1.0.0")
+    parser.add_argument("--out", default="static/datasets/beats", help="Output directory")
+    parser.add_argument("--window", type=int, default=250, help="Samples per beat at 250 Hz")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Beat matching tolerance in seconds")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    records = find_records(args.directory)
+    if not records:
+        print(f"No WFDB records with annotations in {args.directory}")
+        return
+
+    start = time.perf_counter()
+    summary = export_beat_dataset(records, args.out, args.window, args.tolerance, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"Exported {summary['beats']} beats from {summary['records']} records to {args.out} in {elapsed:.1f}s")
+    for label, count in summary["per_label"].items():
+        print(f"{label:>8}: {count}")
+
+
+if __name__ == "__main__":
+    main()
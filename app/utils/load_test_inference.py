@@ -0,0 +1,71 @@
+# load_test_inference.py
+# Usage: python -m app.utils.load_test_inference [--clients 1 2 4 8 16] [--beats-per-request 1] [--duration 5]
+# Starts an inference server in this process and hammers it from N client processes, reporting
+# throughput and p50/p99 request latency per client count.
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from app.services.inference_server import InferenceServer, RemoteModel
+
+
+def run_client(socket_path, beats_per_request, duration, results):
+    """Client process: send requests back to back for `duration` seconds, report latencies."""
+    model = RemoteModel(socket_path)
+    beats = np.random.default_rng(os.getpid()).standard_normal((beats_per_request, 250)).astype(np.float32)
+    latencies = []
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        model.predict(beats[..., np.newaxis])
+        latencies.append(time.perf_counter() - start)
+    model.close()
+    results.put(latencies)
+
+
+def load_test(socket_path, n_clients, beats_per_request, duration):
+    results = multiprocessing.Queue()
+    clients = [multiprocessing.Process(target=run_client, args=(socket_path, beats_per_request, duration, results))
+               for _ in range(n_clients)]
+    for client in clients:
+        client.start()
+    latencies = np.concatenate([results.get() for _ in clients])
+    for client in clients:
+        client.join()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inference server throughput / latency load test.")
+    parser.add_argument("--model", default="models/arrhythmia_model.h5")
+    parser.add_argument("--model-type", default="keras")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--beats-per-request", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per client count")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    socket_path = os.path.join(tempfile.mkdtemp(), "inference.sock")
+    server = InferenceServer(args.model, socket_path, args.model_type,
+                             max_batch=args.max_batch, max_latency_ms=args.max_latency_ms).start()
+
+    print(f"{'clients':>8} {'requests':>9} {'beats/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'beats/batch':>12}")
+    for n_clients in args.clients:
+        before = dict(server.stats)
+        latencies = load_test(socket_path, n_clients, args.beats_per_request, args.duration)
+        batches = server.stats["batches"] - before["batches"]
+        beats = server.stats["beats"] - before["beats"]
+        print(f"{n_clients:>8} {len(latencies):>9} {beats / args.duration:>10.0f} "
+              f"{np.percentile(latencies, 50) * 1e3:>8.2f} {np.percentile(latencies, 99) * 1e3:>8.2f} "
+              f"{beats / max(batches, 1):>12.1f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
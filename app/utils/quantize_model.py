@@ -0,0 +1,121 @@
+# quantize_model.py
+# Usage: python -m app.utils.quantize_model [--model models/arrhythmia_model.h5] [--datasets static/datasets]
+# Writes post-training-quantised int8 / float16 TFLite variants next to the float model
+# (select them with ECGClassifier(..., model_type="int8") or "float16") and prints a
+# prediction-parity, memory and CPU throughput report against an unquantised float32
+# TFLite conversion, so all variants are timed on the same runtime.
+
+import argparse
+import glob
+import os
+import tempfile
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from app.processing.filtering import bandpass_filter
+from app.processing.model_loader import ModelLoader, TFLiteModel, QUANTIZED_MODEL_TYPES, quantized_model_path
+from app.processing.resampling import resample_signal
+from app.processing.segmentation import get_r_peaks, extract_beat_matrix
+from app.services.upload_signal import SignalFileUploader
+
+
+def collect_beats(datasets_dir):
+    """Beats from every CSV / WFDB record under datasets_dir, processed like the app does."""
+    files = sorted(glob.glob(os.path.join(datasets_dir, "*.csv")))
+    files += sorted(glob.glob(os.path.join(datasets_dir, "*", "*.hea")))
+
+    all_beats = []
+    for file_path in files:
+        timebase, signal, _ = SignalFileUploader.load_timed_signal(file_path)
+        if signal is None:
+            continue
+        signal, fs = resample_signal(signal, timebase.fs)
+        filtered = bandpass_filter(signal, fs=fs)
+        beats, _ = extract_beat_matrix(filtered, get_r_peaks(filtered, sampling_rate=fs))
+        all_beats.append(beats)
+    return np.concatenate(all_beats)
+
+
+def convert(keras_model, variant, calibration_beats):
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    if variant == "float32":
+        return converter.convert()  # unquantised baseline
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if variant == "int8":
+        # Full-integer kernels calibrated on real beats; float32 in/out keeps the classifier API unchanged
+        converter.representative_dataset = lambda: ([beat[np.newaxis, :, np.newaxis]] for beat in calibration_beats)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    elif variant == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    return converter.convert()
+
+
+def tensor_kib(model, batch_size=256):
+    """Memory of all interpreter tensors (weights + activations) at the given batch size."""
+    model.predict(np.zeros((batch_size, model.interpreter.get_input_details()[0]["shape"][1], 1), np.float32))
+    details = model.interpreter.get_tensor_details()
+    return sum(int(np.prod(d["shape"])) * np.dtype(d["dtype"]).itemsize for d in details) / 1024
+
+
+def throughput(model, beats, batch_size=256, repeats=3):
+    """Best-of-N beats/second for batched CPU inference."""
+    batch = beats[:batch_size, :, np.newaxis]
+    model.predict(batch, verbose=0)  # warm-up
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for i in range(0, len(beats), batch_size):
+            model.predict(beats[i:i + batch_size, :, np.newaxis], verbose=0)
+        best = min(best, time.perf_counter() - start)
+    return len(beats) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantise the arrhythmia model and check accuracy parity.")
+    parser.add_argument("--model", default="models/arrhythmia_model.h5")
+    parser.add_argument("--datasets", default="static/datasets")
+    parser.add_argument("--calibration-beats", type=int, default=500)
+    args = parser.parse_args()
+
+    beats = collect_beats(args.datasets)
+    # Calibrate and score on disjoint beats so parity is not measured on the calibration set
+    order = np.random.default_rng(0).permutation(len(beats))
+    n_calibration = min(args.calibration_beats, len(beats) // 2)
+    calibration, held_out = beats[order[:n_calibration]], beats[order[n_calibration:]]
+
+    float_model = ModelLoader(args.model, "keras").get_model()
+    for variant in QUANTIZED_MODEL_TYPES:
+        with open(quantized_model_path(args.model, variant), "wb") as f:
+            f.write(convert(float_model, variant, calibration))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline_path = os.path.join(tmp, "float32.tflite")
+        with open(baseline_path, "wb") as f:
+            f.write(convert(float_model, "float32", calibration))
+        variants = [("float32", baseline_path)]
+        variants += [(v, quantized_model_path(args.model, v)) for v in QUANTIZED_MODEL_TYPES]
+
+        print(f"{len(beats)} beats from {args.datasets}: {len(calibration)} for calibration, "
+              f"{len(held_out)} held out for parity")
+        print(f"Keras float32 reference: {throughput(float_model, held_out):.0f} beats/s through model.predict "
+              f"(includes per-call framework overhead)\n")
+        print(f"{'model':>8} {'file KiB':>9} {'mem KiB':>9} {'agreement':>10} {'max |dp|':>9} "
+              f"{'beats/s':>10} {'speed-up':>9}")
+
+        reference = baseline_speed = None
+        for variant, path in variants:
+            model = TFLiteModel(path)
+            probs = np.concatenate([model.predict(held_out[i:i + 1024, :, np.newaxis])
+                                    for i in range(0, len(held_out), 1024)])
+            speed = throughput(model, held_out)
+            if reference is None:
+                reference, baseline_speed = probs, speed
+            agreement = np.mean(probs.argmax(axis=1) == reference.argmax(axis=1))
+            print(f"{variant:>8} {os.path.getsize(path) / 1024:>9.1f} {tensor_kib(model):>9.1f} {agreement:>10.2%} "
+                  f"{np.abs(probs - reference).max():>9.4f} {speed:>10.0f} {speed / baseline_speed:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
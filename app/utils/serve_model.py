@@ -0,0 +1,30 @@
+# serve_model.py
+# Usage: python -m app.utils.serve_model [--model models/arrhythmia_model.h5] [--socket /tmp/pulsespy-inference.sock]
+# Hosts one classifier for every PulseSpy window on this host. Start the GUI with
+# PULSESPY_INFERENCE_SOCKET=<socket> to use it instead of loading its own model copy.
+
+import argparse
+
+from app.services.inference_server import InferenceServer, DEFAULT_SOCKET_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared micro-batching inference server.")
+    parser.add_argument("--model", default="models/arrhythmia_model.h5")
+    parser.add_argument("--model-type", default="keras", help="keras, tflite, int8 or float16")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH)
+    parser.add_argument("--max-batch", type=int, default=256, help="Beats per micro-batch")
+    parser.add_argument("--max-latency-ms", type=float, default=5.0, help="Batching deadline per request")
+    args = parser.parse_args()
+
+    server = InferenceServer(args.model, args.socket, args.model_type,
+                             max_batch=args.max_batch, max_latency_ms=args.max_latency_ms)
+    print(f"Serving {args.model} ({args.model_type}) on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# startup_report.py
+# Usage: python -m app.utils.startup_report [--budget 1.5] [--top 15]
+# Launches the GUI in a fresh interpreter under `-X importtime`, reports the slowest imports and
+# time-to-first-window, and exits non-zero if the budget is exceeded or a deferred module loads at startup.
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+# Heavy dependencies that must only load on first file open / first analysis / first alarm
+DEFERRED_MODULES = ("pandas", "wfdb", "scipy.signal", "biosppy", "tensorflow", "joblib", "PyQt5.QtMultimedia")
+
+PROBE = f"""
+import sys, time
+start = time.perf_counter()
+from app.controller import MainWindowController
+controller = MainWindowController()
+controller.MainWindow.show()
+controller.app.processEvents()
+print("first_window_sec", time.perf_counter() - start)
+print("loaded", *[m for m in {DEFERRED_MODULES!r} if m in sys.modules])
+"""
+
+
+def parse_importtime(stderr):
+    """`-X importtime` lines -> list of (module, self_us, cumulative_us)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup import-time report and time-to-first-window budget.")
+    parser.add_argument("--budget", type=float, default=1.5, help="Max time-to-first-window (s)")
+    parser.add_argument("--top", type=int, default=15, help="Packages listed in the report")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE],
+                          capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        print(proc.stderr)
+        sys.exit(proc.returncode)
+
+    probe = dict(line.split(" ", 1) for line in proc.stdout.splitlines() if " " in line)
+    first_window_sec = float(probe["first_window_sec"])
+    loaded = probe.get("loaded", "").split()
+
+    # Self time summed per top-level package
+    package_us = defaultdict(int)
+    for module, self_us, _ in parse_importtime(proc.stderr):
+        package_us[module.split(".")[0]] += self_us
+    total_us = sum(package_us.values())
+
+    print(f"{'package':<24} {'import ms':>10} {'share':>7}")
+    for package, us in sorted(package_us.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<24} {us / 1000:>10.1f} {us / total_us:>7.1%}")
+    print(f"\nTotal import time: {total_us / 1e6:.2f} s")
+    print(f"Time to first window: {first_window_sec:.2f} s (budget {args.budget:.2f} s)")
+
+    failed = False
+    if first_window_sec > args.budget:
+        print("FAIL: time-to-first-window over budget")
+        failed = True
+    if loaded:
+        print(f"FAIL: deferred modules imported at startup: {', '.join(loaded)}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()